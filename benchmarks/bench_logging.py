@@ -0,0 +1,87 @@
+"""Время, которое вызывающий поток тратит на логирование.
+
+Сравнивает синхронный RotatingFileHandler с очередью
+QueueHandler/QueueListener и буферизованной записью в файл:
+со стандартным QueueHandler, который форматирует запись до постановки
+в очередь, и с DeferredQueueHandler парсера, который форматирование
+переносит в поток слушателя.
+
+    python benchmarks/bench_logging.py [--records N]
+"""
+import argparse
+import logging
+import queue
+import sys
+import tempfile
+import time
+from logging.handlers import (MemoryHandler, QueueHandler, QueueListener,
+                              RotatingFileHandler)
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+LOG_FORMAT = '"%(asctime)s - [%(levelname)s] - %(message)s"'
+
+
+def emit(logger, records):
+    started = time.perf_counter()
+    for number in range(records):
+        logger.info('Несовпадающие статусы: PEP %s', number)
+    return time.perf_counter() - started
+
+
+def sync_logger(path):
+    handler = RotatingFileHandler(path, maxBytes=10 ** 6, backupCount=5)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return [handler], None
+
+
+def queued_logger(path, handler_class=QueueHandler):
+    file_handler = RotatingFileHandler(path, maxBytes=10 ** 6, backupCount=5)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(
+        log_queue, MemoryHandler(100, target=file_handler))
+    listener.start()
+    return [handler_class(log_queue)], listener
+
+
+def deferred_logger(path):
+    sys.path.insert(0, str(SRC_DIR))
+    from configs import DeferredQueueHandler
+
+    return queued_logger(path, DeferredQueueHandler)
+
+
+def measure(name, factory, records, directory):
+    logger = logging.getLogger(f'bench.{name}')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handlers, listener = factory(Path(directory) / f'{name}.log')
+    for handler in handlers:
+        logger.addHandler(handler)
+    elapsed = emit(logger, records)
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+    for handler in handlers:
+        handler.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=20000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        for name, factory in (('sync', sync_logger),
+                              ('queue', queued_logger),
+                              ('deferred', deferred_logger)):
+            elapsed = measure(name, factory, args.records, directory)
+            print(f'{name:>8}: {elapsed * 1000:8.1f} мс на {args.records} '
+                  f'записей, {elapsed / args.records * 1e6:.2f} мкс/запись')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Замер времени и памяти на разбор одной страницы: через str и bytes.
+
+Запуск из корня проекта:
+
+    python benchmarks/bench_parse.py [путь к HTML-файлу] [--repeat N]
+
+Без файла используется синтетическая страница, похожая на карточку PEP.
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+SYNTHETIC_PAGE = (
+    '<html><head><meta charset="utf-8"><title>PEP</title></head><body>'
+    '<section id="pep-content"><dl><dt>Status</dt><dd>Final</dd></dl>'
+    + '<p>Привет, PEP! Lorem ipsum dolor sit amet.</p>' * 5000
+    + '</section></body></html>'
+).encode('utf-8')
+
+
+def parse_text(body):
+    return BeautifulSoup(body.decode('utf-8'), 'lxml')
+
+
+def parse_bytes(body):
+    return BeautifulSoup(body, 'lxml', from_encoding='utf-8')
+
+
+def measure(parse, body, repeat):
+    """Время, пик и прирост памяти на один разбор.
+
+    Перед каждым разбором вызывается gc.collect(), а прирост считается
+    как разница снимков tracemalloc до и после разбора, пока дерево
+    ещё живо, — то есть память, которую удерживает одна страница.
+    """
+    elapsed = peaks = sizes = blocks = 0
+    tracemalloc.start()
+    for _ in range(repeat):
+        gc.collect()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        soup = parse(body)
+        elapsed += time.perf_counter() - started
+        peaks += tracemalloc.get_traced_memory()[1]
+        stats = tracemalloc.take_snapshot().compare_to(before, 'filename')
+        sizes += sum(stat.size_diff for stat in stats)
+        blocks += sum(stat.count_diff for stat in stats)
+        del soup
+    tracemalloc.stop()
+    return elapsed / repeat, peaks / repeat, sizes / repeat, blocks / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('page', nargs='?', type=Path)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    body = args.page.read_bytes() if args.page else SYNTHETIC_PAGE
+
+    print(f'Размер страницы: {len(body)} байт')
+    for name, parse in (('str', parse_text), ('bytes', parse_bytes)):
+        elapsed, peak, size, blocks = measure(parse, body, args.repeat)
+        print(f'{name:>5}: {elapsed * 1000:8.1f} мс, '
+              f'пик {peak / 2 ** 20:6.2f} МиБ, '
+              f'удерживается {size / 2 ** 20:6.2f} МиБ '
+              f'в {blocks:.0f} блоках на страницу')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
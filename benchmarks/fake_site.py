@@ -0,0 +1,226 @@
+"""Локальная замена docs.python.org и peps.python.org для нагрузочных тестов.
+
+Страницы генерируются на лету и повторяют разметку, которую ищет парсер:
+
+    /numerical/                 числовой индекс PEP (N строк)
+    /pep-NNNN/                  карточка PEP со статусом
+    /3/                         главная документации с боковой панелью
+    /3/whatsnew/                список версий What's New
+    /3/whatsnew/3.X.html        страница What's New (с объёмным текстом)
+    /3/download.html            ссылка на PDF-архив
+    /3/archives/*.zip           архив заданного размера
+    /__stats__                  счётчики запросов, ошибок и 429 (JSON)
+
+Задержка, доля ошибок 500 и ответов 429 задаются параметрами.
+
+    python benchmarks/fake_site.py --peps 10000 --latency 0.05 --port 8000
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PEP_TYPES = ('S', 'I', 'P')
+PEP_STATUSES = (
+    ('A', 'Accepted'), ('A', 'Active'), ('D', 'Deferred'), ('F', 'Final'),
+    ('P', 'Provisional'), ('R', 'Rejected'), ('S', 'Superseded'),
+    ('W', 'Withdrawn'), ('', 'Draft'),
+)
+TYPE_NAMES = {'S': 'Standards Track', 'I': 'Informational', 'P': 'Process'}
+
+
+class SiteConfig:
+    def __init__(self, peps=1000, versions=14, latency=0.0, error_rate=0.0,
+                 throttle_rate=0.0, page_size=20000, archive_size=10 ** 6,
+                 seed=0):
+        self.peps = peps
+        self.versions = versions
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.page_size = page_size
+        self.archive_size = archive_size
+        self.seed = seed
+
+
+def pep_fields(config, number):
+    rnd = random.Random(config.seed * 100003 + number)
+    pep_type = rnd.choice(PEP_TYPES)
+    letter, status = rnd.choice(PEP_STATUSES)
+    return pep_type + letter, TYPE_NAMES[pep_type], status
+
+
+def numerical_index(config):
+    rows = []
+    for number in range(1, config.peps + 1):
+        abbr, type_name, status = pep_fields(config, number)
+        rows.append(
+            f'<tr><td><abbr title="{type_name}, {status}">{abbr}</abbr></td>'
+            f'<td><a href="../pep-{number:04d}/">{number}</a></td>'
+            f'<td>PEP {number}</td><td>Author</td></tr>'
+        )
+    return (
+        '<html><body><section id="numerical-index"><table><tbody>'
+        + ''.join(rows) + '</tbody></table></section></body></html>'
+    )
+
+
+def pep_card(config, number):
+    _, _, status = pep_fields(config, number)
+    filler = '<p>Rationale.</p>' * (config.page_size // 16)
+    return (
+        '<html><body><section id="pep-content">'
+        f'<h1>PEP {number}</h1><dl><dt>Author<span>:</span></dt>'
+        '<dd>Author</dd>'
+        f'<dt>Status<span>:</span></dt><dd>{status}</dd></dl>{filler}'
+        '</section></body></html>'
+    )
+
+
+def docs_index(config):
+    items = ''.join(
+        f'<li><a href="https://docs.python.org/3.{minor}/">'
+        f'Python 3.{minor} ({"stable" if minor > 9 else "EOL"})</a></li>'
+        for minor in range(config.versions, 0, -1)
+    )
+    return (
+        '<html><body><div class="sphinxsidebarwrapper">'
+        '<h3>Navigation</h3><ul><li><a href="#">Index</a></li></ul>'
+        f'<h3>Docs by version</h3><ul>{items}'
+        '<li><a href="https://www.python.org/doc/versions/">All versions</a>'
+        '</li></ul></div></body></html>'
+    )
+
+
+def whats_new_index(config):
+    items = ''.join(
+        f'<li class="toctree-l1"><a href="3.{minor}.html">3.{minor}</a></li>'
+        for minor in range(config.versions, 0, -1)
+    )
+    return (
+        '<html><body><section id="what-s-new-in-python">'
+        f'<div class="toctree-wrapper"><ul>{items}</ul></div>'
+        '</section></body></html>'
+    )
+
+
+def whats_new_page(config, minor):
+    filler = '<p>Release notes.</p>' * (config.page_size // 4)
+    return (
+        f'<html><body><h1>What’s New In Python 3.{minor}</h1>'
+        f'<dl><dt>Editor</dt>\n<dd>Editor {minor}</dd></dl>{filler}'
+        '</body></html>'
+    )
+
+
+def download_page(config):
+    return (
+        '<html><body><table class="docutils"><tr><td>'
+        '<a href="archives/python-docs-pdf-a4.zip">PDF A4</a>'
+        '</td></tr></table></body></html>'
+    )
+
+
+def route(config, path):
+    if path == '/numerical/':
+        return 'text/html', numerical_index(config)
+    if path.startswith('/pep-') and path.endswith('/'):
+        return 'text/html', pep_card(config, int(path[5:-1]))
+    if path == '/3/':
+        return 'text/html', docs_index(config)
+    if path == '/3/whatsnew/':
+        return 'text/html', whats_new_index(config)
+    if path.startswith('/3/whatsnew/3.') and path.endswith('.html'):
+        return 'text/html', whats_new_page(config, int(path[14:-5]))
+    if path == '/3/download.html':
+        return 'text/html', download_page(config)
+    if path.startswith('/3/archives/'):
+        return 'application/zip', b'\0' * config.archive_size
+    return None
+
+
+class FakeSiteHandler(BaseHTTPRequestHandler):
+    config = SiteConfig()
+    stats = {'requests': 0, 'errors': 0, 'throttled': 0}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        config = self.config
+        if self.path == '/__stats__':
+            with self.lock:
+                stats = json.dumps(self.stats)
+            return self._send(200, 'application/json', stats)
+        with self.lock:
+            self.stats['requests'] += 1
+        if config.latency:
+            time.sleep(config.latency)
+        if random.random() < config.throttle_rate:
+            with self.lock:
+                self.stats['throttled'] += 1
+            return self._send(429, 'text/plain', 'Too Many Requests',
+                              {'Retry-After': '1'})
+        if random.random() < config.error_rate:
+            with self.lock:
+                self.stats['errors'] += 1
+            return self._send(500, 'text/plain', 'Internal Server Error')
+        page = route(config, self.path)
+        if page is None:
+            return self._send(404, 'text/plain', 'Not Found')
+        self._send(200, *page)
+
+    def _send(self, status, content_type, body, headers=None):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+            content_type += '; charset=utf-8'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(config, port=0):
+    handler = type('Handler', (FakeSiteHandler,), {
+        'config': config,
+        'stats': {'requests': 0, 'errors': 0, 'throttled': 0},
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--peps', type=int, default=1000)
+    parser.add_argument('--versions', type=int, default=14)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--page-size', type=int, default=20000)
+    args = parser.parse_args()
+    config = SiteConfig(
+        peps=args.peps, versions=args.versions, latency=args.latency,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        page_size=args.page_size,
+    )
+    server = start_server(config, args.port)
+    print(f'http://127.0.0.1:{args.port}/  (Ctrl+C для остановки)')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""Нагрузочный прогон режимов парсера против локального fake_site.
+
+Для каждого размера корпуса, режима, числа воркеров и состояния кеша
+сценарий запускается в отдельном процессе во временной директории
+(свой HTTP-кеш, хранилище извлечённых данных и файлы состояния).
+Результат — таблица: время, запросы к серверу, запросов в секунду
+и пиковая память (max RSS) процесса и его воркеров.
+
+    python benchmarks/loadtest.py --sizes 1000 10000 --workers 1 4 8 \\
+        --latency 0.02 --csv scaling.csv
+"""
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from fake_site import SiteConfig, start_server
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+MODES = ('pep', 'whats-new', 'latest-versions', 'download')
+CACHES = ('cold', 'warm')
+COLUMNS = ('peps', 'mode', 'workers', 'cache', 'seconds', 'requests',
+           'requests_per_second', 'errors', 'max_rss_mib')
+
+
+def _patch_parser(base_url, directory):
+    sys.path.insert(0, str(SRC_DIR))
+    import main
+    import utils
+
+    state_dir = directory / 'state'
+    main.PEP = base_url + 'numerical/'
+    main.MAIN_DOC_URL = base_url + '3/'
+    main.BASE_DIR = directory
+    main.STATE_DIR = state_dir
+    main.PEP_INDEX_SNAPSHOT = state_dir / 'pep_index.json'
+    main.PEP_ROWS_SNAPSHOT = state_dir / 'pep_rows.json'
+    main.VERSIONS_CACHE = state_dir / 'versions.json'
+    utils.STATE_DIR = state_dir
+    utils.CONTENT_STORE_PATH = state_dir / 'extracted.sqlite3'
+    return main
+
+
+def run_scenario(base_url, mode, workers, directory):
+    directory = Path(directory)
+    os.chdir(directory)
+    logging.disable(logging.CRITICAL)
+    main = _patch_parser(base_url, directory)
+
+    import requests_cache
+
+    options = {
+        'pep': {'workers': workers, 'progress': 'none'},
+        'whats-new': {'workers': workers, 'progress': 'none'},
+    }.get(mode, {})
+    started = time.perf_counter()
+    main.MODE_TO_FUNCTION[mode](requests_cache.CachedSession(), **options)
+    elapsed = time.perf_counter() - started
+
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {'seconds': elapsed, 'max_rss_kib': max(own, children)}
+
+
+def _server_stats(base_url):
+    with urllib.request.urlopen(base_url + '__stats__') as response:
+        return json.load(response)
+
+
+def _serve(config, port, ready):
+    start_server(config, port)
+    ready.set()
+    while True:
+        time.sleep(3600)
+
+
+def _free_port():
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _run_in_subprocess(base_url, mode, workers, directory):
+    output = subprocess.run(
+        [sys.executable, __file__, '--run-scenario',
+         json.dumps([base_url, mode, workers, str(directory)])],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(base_url, size, mode, workers, directory):
+    rows = []
+    for cache in CACHES:
+        before = _server_stats(base_url)
+        result = _run_in_subprocess(base_url, mode, workers, directory)
+        after = _server_stats(base_url)
+        requests = after['requests'] - before['requests']
+        errors = (after['errors'] + after['throttled']
+                  - before['errors'] - before['throttled'])
+        rows.append({
+            'peps': size,
+            'mode': mode,
+            'workers': workers,
+            'cache': cache,
+            'seconds': round(result['seconds'], 3),
+            'requests': requests,
+            'requests_per_second': round(requests / result['seconds'], 1),
+            'errors': errors,
+            'max_rss_mib': round(result['max_rss_kib'] / 1024, 1),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000])
+    parser.add_argument('--modes', nargs='+', choices=MODES,
+                        default=['pep', 'whats-new', 'download'])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--versions', type=int, default=14)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--page-size', type=int, default=20000)
+    parser.add_argument('--csv', type=Path)
+    parser.add_argument('--run-scenario', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scenario:
+        print(json.dumps(run_scenario(*json.loads(args.run_scenario))))
+        return 0
+
+    rows = []
+    writer = csv.DictWriter(sys.stdout, COLUMNS, delimiter='\t')
+    writer.writeheader()
+    for size in args.sizes:
+        config = SiteConfig(
+            peps=size, versions=args.versions, latency=args.latency,
+            error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+            page_size=args.page_size,
+        )
+        port = _free_port()
+        ready = multiprocessing.Event()
+        server = multiprocessing.Process(
+            target=_serve, args=(config, port, ready), daemon=True)
+        server.start()
+        ready.wait()
+        base_url = f'http://127.0.0.1:{port}/'
+        try:
+            for mode in args.modes:
+                for workers in args.workers:
+                    with tempfile.TemporaryDirectory() as directory:
+                        for row in measure(base_url, size, mode, workers,
+                                           directory):
+                            writer.writerow(row)
+                            sys.stdout.flush()
+                            rows.append(row)
+        finally:
+            server.terminate()
+
+    if args.csv:
+        with open(args.csv, 'w', encoding='utf-8', newline='') as f:
+            csv_writer = csv.DictWriter(f, COLUMNS)
+            csv_writer.writeheader()
+            csv_writer.writerows(rows)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
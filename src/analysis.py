@@ -0,0 +1,162 @@
+from array import array
+from collections import Counter
+
+from constants import (EXPECTED_STATUS, PEP_COUNT_HEADER, PEP_SCOPE_PATTERN,
+                       PEP_SCOPE_SEPARATOR)
+from records import PepRecord
+
+
+class PepTable:
+    """Собранные строки pep: буква из индекса, ссылка и статус карточки.
+
+    Буквы и статусы хранятся как коды категорий в массивах array,
+    поэтому сбор строки в цикле загрузки — это три append без
+    форматирования и поиска в EXPECTED_STATUS.
+    """
+
+    def __init__(self):
+        self.urls = []
+        self.letter_codes = array('H')
+        self.status_codes = array('H')
+        self.letters = []
+        self.statuses = []
+        self._letter_index = {}
+        self._status_index = {}
+
+    def __len__(self):
+        return len(self.urls)
+
+    @staticmethod
+    def _code(value, names, index):
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(names)
+            names.append(value)
+        return code
+
+    def append(self, letter, url, status):
+        self.urls.append(url)
+        self.letter_codes.append(
+            self._code(letter, self.letters, self._letter_index))
+        self.status_codes.append(
+            self._code(status, self.statuses, self._status_index))
+
+    def rows(self):
+        """Строки (ссылка, буква, статус) в порядке сбора."""
+        return [
+            (url, self.letters[letter_code], self.statuses[status_code])
+            for url, letter_code, status_code in zip(
+                self.urls, self.letter_codes, self.status_codes)
+        ]
+
+
+class PepAnalysis:
+    """Итоги pep, посчитанные за один проход по PepTable."""
+
+    def __init__(self, status_counts, crosstab, mismatches, unknown):
+        self.status_counts = status_counts
+        self.crosstab = crosstab
+        self.mismatches = mismatches
+        self.unknown = unknown
+
+
+def analyze_pep_table(table):
+    pairs = Counter(zip(table.letter_codes, table.status_codes))
+    status_counts = Counter()
+    crosstab = {}
+    bad_pairs = set()
+    unknown_letters = set()
+    for (letter_code, status_code), count in pairs.items():
+        letter = table.letters[letter_code]
+        status = table.statuses[status_code]
+        status_counts[status] += count
+        crosstab[letter, status] = count
+        if letter not in EXPECTED_STATUS:
+            unknown_letters.add(letter_code)
+        elif status not in EXPECTED_STATUS[letter]:
+            bad_pairs.add((letter_code, status_code))
+
+    mismatches = []
+    unknown = []
+    if bad_pairs or unknown_letters:
+        for url, letter_code, status_code in zip(
+                table.urls, table.letter_codes, table.status_codes):
+            if letter_code in unknown_letters:
+                unknown.append(PepRecord(
+                    table.letters[letter_code], url,
+                    table.statuses[status_code]))
+            elif (letter_code, status_code) in bad_pairs:
+                mismatches.append(PepRecord(
+                    table.letters[letter_code], url,
+                    table.statuses[status_code]))
+    return PepAnalysis(dict(status_counts), crosstab, mismatches, unknown)
+
+
+def crosstab_table(analysis):
+    letters = sorted({letter for letter, _ in analysis.crosstab})
+    statuses = sorted(analysis.status_counts)
+    return [
+        ('Буква \\ Статус', *statuses),
+        *(
+            (letter or '-', *(
+                analysis.crosstab.get((letter, status), 0)
+                for status in statuses
+            ))
+            for letter in letters
+        ),
+    ]
+
+
+def pep_scope_label(pep_range=None, shard=None):
+    parts = []
+    if pep_range is not None:
+        parts.append(f'PEP {pep_range[0]}-{pep_range[1]}')
+    if shard is not None:
+        parts.append(f'шард {shard[0]}/{shard[1]}')
+    return ', '.join(parts)
+
+
+def pep_scope_name(pep_range=None, shard=None):
+    """Часть PEP в префиксе файла результата."""
+    parts = []
+    if pep_range is not None:
+        parts.append(f'range-{pep_range[0]}-{pep_range[1]}')
+    if shard is not None:
+        parts.append(f'shard-{shard[0]}-of-{shard[1]}')
+    return '-'.join(parts)
+
+
+def pep_count_header(scopes=()):
+    """Заголовок таблицы статусов; scopes — пары (диапазон, шард)."""
+    label = PEP_SCOPE_SEPARATOR.join(
+        pep_scope_label(*scope) for scope in scopes)
+    return ('Статус', f'{PEP_COUNT_HEADER} ({label})' if label
+            else PEP_COUNT_HEADER)
+
+
+def parse_pep_scopes(header):
+    """Пары (диапазон, шард) из заголовка таблицы статусов.
+
+    Для полного запуска — пустой список, для заголовка другой
+    таблицы — None.
+    """
+    if len(header) != 2 or header[0] != 'Статус':
+        return None
+    count = str(header[1])
+    if count == PEP_COUNT_HEADER:
+        return []
+    prefix = f'{PEP_COUNT_HEADER} ('
+    if not (count.startswith(prefix) and count.endswith(')')):
+        return None
+    scopes = []
+    for part in count[len(prefix):-1].split(PEP_SCOPE_SEPARATOR):
+        match = PEP_SCOPE_PATTERN.match(part)
+        if not part or match is None:
+            return None
+        pep_range = shard = None
+        if match['start'] is not None:
+            pep_range = int(match['start']), int(match['end'])
+        if match['index'] is not None:
+            shard = int(match['index']), int(match['count'])
+        scopes.append((pep_range, shard))
+    return scopes
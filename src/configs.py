@@ -1,9 +1,83 @@
 import argparse
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import multiprocessing
+import queue
+from logging.handlers import (MemoryHandler, QueueHandler, QueueListener,
+                              RotatingFileHandler)
 
-from constants import (DT_FORMAT, FILE_OUTPUT, LOG_DIR,
-                       LOG_FILE, LOG_FORMAT, PRETTY_OUTPUT)
+from constants import (DT_FORMAT, FILE_OUTPUT, JSON_LOG_FORMAT,
+                       LOG_BUFFER_SIZE, LOG_DIR, LOG_FILE, LOG_FORMAT,
+                       PRETTY_OUTPUT, PROGRESS_AUTO, PROGRESS_BAR,
+                       PROGRESS_LOG, PROGRESS_NONE, TEXT_LOG_FORMAT,
+                       WORKER_LOG_FORMAT)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Форматирует запись лога как одну строку JSON."""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, DT_FORMAT),
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler, который не форматирует запись в вызывающем потоке.
+
+    Стандартный prepare() подставляет аргументы и трассировку в msg ещё
+    до постановки в очередь; здесь запись уходит в очередь как есть,
+    а форматирование выполняют обработчики в потоке QueueListener.
+    Поэтому изменяемые объекты в аргументах лога будут отформатированы
+    в том состоянии, в котором они окажутся к моменту записи.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def pep_range_type(value):
+    try:
+        start, end = (int(part) for part in value.split('-'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'Диапазон должен иметь вид START-END: {value}')
+    if start > end:
+        raise argparse.ArgumentTypeError(
+            f'Начало диапазона больше конца: {value}')
+    return start, end
+
+
+def shard_type(value):
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'Шард должен иметь вид I/N: {value}')
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(
+            f'Номер шарда должен быть от 1 до N: {value}')
+    return index, count
+
+
+def duration_type(value):
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    number, unit = (value[:-1], value[-1]) if value[-1:] in units else (
+        value, 's')
+    try:
+        seconds = float(number) * units[unit]
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'Срок должен иметь вид 300, 300s, 5m или 1h: {value}')
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError(
+            f'Срок должен быть положительным: {value}')
+    return seconds
 
 
 def configure_argument_parser(available_models):
@@ -25,19 +99,152 @@ def configure_argument_parser(available_models):
         choices=(PRETTY_OUTPUT, FILE_OUTPUT),
         help='Дополнительные способы вывода данных'
     )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        help=('Количество локальных процессов для pep '
+              'или потоков загрузки для whats-new')
+    )
+    parser.add_argument(
+        '--queue',
+        help='Путь к SQLite-очереди задач, общей для процессов одного узла'
+    )
+    parser.add_argument(
+        '--worker',
+        action='store_true',
+        help='Только обрабатывать задачи из очереди --queue'
+    )
+    parser.add_argument(
+        '--range',
+        dest='pep_range',
+        type=pep_range_type,
+        help='Обрабатывать только PEP с номерами START-END'
+    )
+    parser.add_argument(
+        '--shard',
+        type=shard_type,
+        help='Обрабатывать только шард I/N по номеру PEP'
+    )
+    parser.add_argument(
+        '--merge',
+        nargs='+',
+        metavar='CSV',
+        help='Объединить файлы результатов pep вместо парсинга'
+    )
+    parser.add_argument(
+        '--estimate',
+        action='store_true',
+        help='Оценить статусы pep по индексу без загрузки карточек'
+    )
+    parser.add_argument(
+        '--verify-sample',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Проверить оценку на N случайных карточках'
+    )
+    parser.add_argument(
+        '--verify-changed',
+        action='store_true',
+        help='Проверить карточки, изменившиеся с прошлого запуска'
+    )
+    parser.add_argument(
+        '--log-format',
+        choices=(TEXT_LOG_FORMAT, JSON_LOG_FORMAT),
+        default=TEXT_LOG_FORMAT,
+        help='Формат записей лога'
+    )
+    parser.add_argument(
+        '-v',
+        '--verbose',
+        action='store_true',
+        help='Логировать каждое несовпадение статусов и аббревиатуру'
+    )
+    parser.add_argument(
+        '--matrix',
+        action='store_true',
+        help='Вывести матрицу: буква статуса в индексе против статуса PEP'
+    )
+    parser.add_argument(
+        '--progress',
+        choices=(PROGRESS_AUTO, PROGRESS_BAR, PROGRESS_LOG, PROGRESS_NONE),
+        default=PROGRESS_AUTO,
+        help='Способ отображения прогресса'
+    )
+    parser.add_argument(
+        '--diff',
+        action='store_true',
+        help='Вывести только изменения относительно прошлого файла results'
+    )
+    parser.add_argument(
+        '--deadline',
+        type=duration_type,
+        help='Срок выполнения запуска, например 300s или 5m'
+    )
+    parser.add_argument(
+        '--metrics-file',
+        metavar='PATH',
+        help='Записать метрики в формате Prometheus (textfile collector)'
+    )
     return parser
 
 
-def configure_logging():
+def check_arguments(parser, args):
+    if args.worker and args.queue is None:
+        parser.error('--worker требует указать очередь через --queue')
+    if args.matrix and (args.diff or args.merge):
+        parser.error('--matrix нельзя использовать вместе с --diff и --merge')
+
+
+def configure_logging(log_format=TEXT_LOG_FORMAT):
     LOG_DIR.mkdir(exist_ok=True)
 
+    if log_format == JSON_LOG_FORMAT:
+        formatter = JsonLinesFormatter()
+    else:
+        formatter = logging.Formatter(LOG_FORMAT, DT_FORMAT)
+
     rotating_handler = RotatingFileHandler(
         LOG_FILE, maxBytes=10 ** 6, backupCount=5
     )
+    rotating_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
 
-    logging.basicConfig(
-        datefmt=DT_FORMAT,
-        format=LOG_FORMAT,
-        level=logging.INFO,
-        handlers=(rotating_handler, logging.StreamHandler())
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(
+        log_queue,
+        MemoryHandler(LOG_BUFFER_SIZE, flushLevel=logging.ERROR,
+                      target=rotating_handler),
+        stream_handler,
     )
+    queue_handler = DeferredQueueHandler(log_queue)
+    logging.basicConfig(level=logging.INFO, handlers=(queue_handler,))
+    listener.start()
+    return listener
+
+
+def start_worker_logging():
+    """Очередь логов дочерних процессов и слушатель, который передаёт
+    их записи обработчикам координатора."""
+    log_queue = multiprocessing.Queue()
+    listener = QueueListener(log_queue, *logging.getLogger().handlers)
+    listener.start()
+    return log_queue, listener
+
+
+def configure_worker_logging(log_queue):
+    """Направить лог дочернего процесса в очередь координатора.
+
+    Унаследованный после fork обработчик пишет в очередь, которую в
+    дочернем процессе никто не читает. Стандартный QueueHandler
+    форматирует запись до отправки: в другой процесс передаётся только
+    текст, без аргументов и трассировки.
+    """
+    handler = QueueHandler(log_queue)
+    handler.setFormatter(logging.Formatter(WORKER_LOG_FORMAT))
+    root = logging.getLogger()
+    for inherited in root.handlers[:]:
+        root.removeHandler(inherited)
+    root.addHandler(handler)
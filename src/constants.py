@@ -1,3 +1,4 @@
+import re
 from pathlib import Path
 
 PEP = 'https://peps.python.org/numerical/'
@@ -6,10 +7,45 @@ MAIN_DOC_URL = 'https://docs.python.org/3/'
 BASE_DIR = Path(__file__).parent
 LOG_DIR = BASE_DIR / 'logs'
 LOG_FILE = LOG_DIR / 'parser.log'
+STATE_DIR = BASE_DIR / 'state'
+PEP_INDEX_SNAPSHOT = STATE_DIR / 'pep_index.json'
+PEP_ROWS_SNAPSHOT = STATE_DIR / 'pep_rows.json'
+CONTENT_STORE_PATH = STATE_DIR / 'extracted.sqlite3'
+VERSIONS_CACHE = STATE_DIR / 'versions.json'
+VERSIONS_TTL = 600
+VERSION_PATTERN = re.compile(
+    r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)')
 
 LOG_FORMAT = '"%(asctime)s - [%(levelname)s] - %(message)s"'
 DATETIME_FORMAT = '%Y-%m-%d_%H-%M-%S'
 DT_FORMAT = '%d.%m.%Y %H:%M:%S'
+LOG_BUFFER_SIZE = 100
+WORKER_LOG_FORMAT = 'Воркер %(process)d: %(message)s'
+TEXT_LOG_FORMAT = 'text'
+JSON_LOG_FORMAT = 'json'
+
+REQUEST_TIMEOUT = 30
+SOUP_CACHE_SIZE = 64
+CONTENT_STORE_SIZE = 20000
+EXTRACTOR_VERSIONS = {
+    'pep_status': 1,
+    'whats_new': 1,
+    'versions': 2,
+}
+
+WHATS_NEW_WORKERS = 8
+
+QUEUE_POLL_INTERVAL = 0.5
+QUEUE_STALE_TIMEOUT = 300
+QUEUE_MAX_ATTEMPTS = 3
+WORKER_SHUTDOWN_TIMEOUT = 10
+
+PEP_COUNT_HEADER = 'Количество'
+PEP_ROWS_HEADER = ('Ссылка на PEP', 'Буква', 'Статус')
+PEP_SCOPE_PATTERN = re.compile(
+    r'^(?:PEP (?P<start>\d+)-(?P<end>\d+))?(?:, )?'
+    r'(?:шард (?P<index>\d+)/(?P<count>\d+))?$')
+PEP_SCOPE_SEPARATOR = ' + '
 
 EMPTY_RESULT = [
     ('Статус', 'Количество'),
@@ -27,6 +63,48 @@ EXPECTED_STATUS = {
 }
 
 
+METRICS = {
+    'bs4_parser_requests_total': ('counter', 'Выполнено HTTP-запросов'),
+    'bs4_parser_cache_hits_total': (
+        'counter', 'Ответы, полученные из HTTP-кеша'),
+    'bs4_parser_cache_misses_total': (
+        'counter', 'Ответы, загруженные из сети'),
+    'bs4_parser_downloaded_bytes_total': (
+        'counter', 'Байт в телах ответов, загруженных из сети'),
+    'bs4_parser_content_store_hits_total': (
+        'counter', 'Страницы, данные которых взяты по хешу без парсинга'),
+    'bs4_parser_content_store_misses_total': (
+        'counter', 'Страницы, разобранные из-за отсутствия в хранилище'),
+    'bs4_parser_parse_errors_total': (
+        'counter', 'Исключения ParserFindTagException'),
+    'bs4_parser_mode_duration_seconds': (
+        'gauge', 'Длительность работы режима'),
+    'bs4_parser_pages_per_second': (
+        'gauge', 'Запросов в секунду за запуск, включая воркеры pep'),
+    'bs4_parser_pep_status': ('gauge', 'Количество PEP по статусу'),
+    'bs4_parser_last_run_success': (
+        'gauge', '1, если последний запуск завершился без исключения'),
+    'bs4_parser_last_run_incomplete': (
+        'gauge', '1, если результат последнего запуска неполный'),
+    'bs4_parser_last_run_timestamp_seconds': (
+        'gauge', 'Время завершения последнего запуска'),
+}
+
+DIFF_LABELS = {
+    'HEADER': 'Изменение',
+    'ADDED': 'Добавлено',
+    'REMOVED': 'Удалено',
+    'CHANGED': 'Изменено',
+}
+
+PROGRESS_AUTO = 'auto'
+PROGRESS_BAR = 'bar'
+PROGRESS_LOG = 'log'
+PROGRESS_NONE = 'none'
+PROGRESS_INTERVAL = 5
+
+INCOMPLETE_SUFFIX = '_incomplete'
+
 PRETTY_OUTPUT = 'pretty'
 FILE_OUTPUT = 'file'
 
@@ -38,6 +116,13 @@ PEP_LOGGING = {
     'REQUEST_ERROR': 'Ошибка загрузки {}: {}',
     'TAG_ERRORS_HEADER': 'Ошибки при поиске тегов: ',
     'TAG_ERROR': 'Ошибка парсинга {}: {}',
+    'WORKER_ERROR': 'Ошибка воркера при обработке {}: {}',
+    'WORKER_DIED': (
+        'Воркер {} завершился с кодом {}, его задачи возвращены в очередь'
+    ),
+    'WORKERS_EXHAUSTED': (
+        'Воркеры падают слишком часто, ожидание очереди прекращено'
+    ),
     'UNKNOWN_ABBR_HEADER': 'Неизвестная аббревиатура: ',
     'UNKNOWN_ABBR': '{}',
     'DIF_STATUSES_HEADER': 'Несовпадающие статусы: ',
@@ -48,4 +133,39 @@ PEP_LOGGING = {
     'PARSER_ARGS': 'Аргументы командной строки: {}',
     'PARSER_ERROR': 'Произошла ошибка: {}',
     'PARSER_FINISH': 'Парсер завершил работу',
+    'QUEUE_FILLED': 'В очередь {} добавлено задач: {}, локальных воркеров: {}',
+    'PEP_SUMMARY': (
+        'Итоги pep: ошибок {}, неизвестных аббревиатур {}, '
+        'несовпадающих статусов {}'
+    ),
+    'ESTIMATE_CONFIDENCE': (
+        'Оценка по индексу: строк {}, случайная выборка {}, совпало {}, '
+        'нижняя граница точности (95%): {:.1%}; '
+        'изменившихся с прошлого запуска {}'
+    ),
+    'SNAPSHOT_BASELINE': (
+        'Снимка индекса ещё нет: текущий индекс сохранён как базовый, '
+        'изменившиеся карточки не проверяются'
+    ),
+    'MERGE_NOT_PEP': 'Файл {} не является таблицей статусов pep',
+    'MERGE_NOT_SHARD': (
+        'Файл {} не является результатом pep с --range или --shard'
+    ),
+    'MERGE_INCOMPLETE': 'Файл {} содержит неполный результат',
+    'MERGE_OVERLAP': 'Файлы {} и {} содержат одни и те же PEP',
+    'MERGE_MISSING_SHARDS': (
+        'Результат неполный: при объединении не хватает частей {}'
+    ),
+    'DIFF_SUMMARY': 'Изменений относительно прошлого запуска: {}',
+    'PROGRESS': '{}: {} из {}, {:.1f} стр./с, осталось ~{:.0f} с',
+    'RUN_STOPPED': (
+        'Получен сигнал {}: новые загрузки не запускаются, '
+        'ожидаем завершения текущих'
+    ),
+    'DEADLINE_EXCEEDED': 'Истёк срок выполнения запуска',
+    'INCOMPLETE_RESULTS': (
+        'Результат неполный: работа остановлена по сигналу '
+        'или по сроку выполнения'
+    ),
+    'SOUP_CACHE_STATS': 'Кеш разобранных страниц: попаданий {}, промахов {}',
 }
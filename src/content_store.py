@@ -0,0 +1,78 @@
+import json
+import sqlite3
+import threading
+import time
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS extracted (
+    digest TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (digest, extractor)
+)
+'''
+
+
+class ContentStore:
+    """Хранилище уже извлечённых данных, адресуемое хешем тела страницы.
+
+    Для каждого экстрактора хранится его версия: запись с другой версией
+    считается промахом, поэтому изменение логики извлечения достаточно
+    отметить увеличением номера в EXTRACTOR_VERSIONS.
+    """
+
+    def __init__(self, path, versions, max_entries):
+        self.versions = versions
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            str(path), timeout=30, isolation_level=None,
+            check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(SCHEMA)
+
+    def get(self, digest, extractor):
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT version, payload FROM extracted '
+                'WHERE digest = ? AND extractor = ?',
+                (digest, extractor)
+            ).fetchone()
+            if row is None or row[0] != self.versions[extractor]:
+                return None
+            self.connection.execute(
+                'UPDATE extracted SET accessed = ? '
+                'WHERE digest = ? AND extractor = ?',
+                (time.time(), digest, extractor)
+            )
+        return json.loads(row[1])
+
+    def put(self, digest, extractor, payload):
+        with self._lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO extracted '
+                '(digest, extractor, version, payload, accessed) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (digest, extractor, self.versions[extractor],
+                 json.dumps(payload, ensure_ascii=False), time.time())
+            )
+
+    def evict(self):
+        with self._lock:
+            self.connection.execute(
+                'DELETE FROM extracted WHERE rowid IN ('
+                'SELECT rowid FROM extracted ORDER BY accessed DESC '
+                'LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self.connection.execute('DELETE FROM extracted')
+
+    def close(self):
+        self.evict()
+        self.connection.close()
@@ -1,2 +1,6 @@
 class ParserFindTagException(Exception):
     """Вызывается, когда парсер не может найти тег."""
+
+
+class ResultsMergeException(Exception):
+    """Вызывается, когда файлы результатов pep нельзя сложить."""
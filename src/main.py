@@ -1,85 +1,164 @@
+import csv
+import json
 import logging
+import math
+import multiprocessing
+import os
+import random
 import re
+import signal
+import socket
+import tempfile
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from urllib.parse import urljoin
 
 import requests_cache
+from bs4 import SoupStrainer
 from requests import RequestException
-from tqdm import tqdm
 
-from configs import configure_argument_parser, configure_logging
-from constants import (BASE_DIR, EXPECTED_STATUS,
-                       MAIN_DOC_URL, PEP, PEP_LOGGING)
-from exceptions import ParserFindTagException
-from outputs import control_output
-from utils import find_tag, get_soup
+from analysis import (PepTable, analyze_pep_table, crosstab_table,
+                      parse_pep_scopes, pep_count_header, pep_scope_label)
+from configs import (check_arguments, configure_argument_parser,
+                     configure_logging, configure_worker_logging,
+                     start_worker_logging)
+from constants import (BASE_DIR, EXPECTED_STATUS, INCOMPLETE_SUFFIX,
+                       MAIN_DOC_URL, PEP, PEP_INDEX_SNAPSHOT, PEP_LOGGING,
+                       PEP_ROWS_HEADER, PEP_ROWS_SNAPSHOT,
+                       PROGRESS_AUTO, QUEUE_MAX_ATTEMPTS, QUEUE_POLL_INTERVAL,
+                       QUEUE_STALE_TIMEOUT, STATE_DIR, VERSION_PATTERN,
+                       VERSIONS_CACHE, VERSIONS_TTL, WHATS_NEW_WORKERS,
+                       WORKER_SHUTDOWN_TIMEOUT)
+from exceptions import ParserFindTagException, ResultsMergeException
+from outputs import control_output, diff_results
+from progress import make_progress
+from records import CrawlError, VersionEntry, WhatsNewEntry
+import metrics
+import run_control
+from utils import (clear_soup_cache, find_tag, get_content_store,
+                   get_extracted, get_response, get_soup, parse_error,
+                   soup_cache_stats)
+from work_queue import QUEUE_CLOSED, QUEUE_STOPPED, SqliteWorkQueue
+
+
+def _extract_whats_new(soup):
+    return [
+        find_tag(soup, 'h1').text,
+        find_tag(soup, 'dl').text.replace('\n', ' '),
+    ]
+
+
+def _fetch_whats_new_entry(session, whats_new_url, section):
+    if run_control.should_stop():
+        run_control.mark_incomplete()
+        return None
+    version_a_tag = section.find('a')
+    href = version_a_tag['href']
+    version_link = urljoin(whats_new_url, href)
+    try:
+        title, editors = get_extracted(
+            session, version_link, 'whats_new', _extract_whats_new)
+    except RequestException as e:
+        return CrawlError(version_link, 'REQUEST_ERROR', e)
+    except ParserFindTagException as e:
+        return CrawlError(version_link, 'TAG_ERROR', e)
+    return WhatsNewEntry(version_link, title, editors)
 
 
-def whats_new(session):
+def whats_new(session, progress=PROGRESS_AUTO, workers=None):
     errors = []
 
     whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
     soup = get_soup(session, whats_new_url)
     section_by_python = soup.select(
         '#what-s-new-in-python div.toctree-wrapper li.toctree-l1')
-    if section_by_python is None:
-        raise ParserFindTagException('Не найден тег для ')
+    if not section_by_python:
+        raise parse_error('Не найден список версий What\'s New')
 
     results = [('Ссылка на статью', 'Заголовок', 'Редактор, автор')]
-    for section in tqdm(section_by_python):
-        try:
-
-            version_a_tag = section.find('a')
-            href = version_a_tag['href']
-            version_link = urljoin(whats_new_url, href)
-            soup = get_soup(session, version_link)
-            results.append((
-                version_link,
-                find_tag(soup, 'h1'),
-                find_tag(soup, 'dl').text.replace('\n', ' ')
-            ))
-
-        except RequestException as e:
-            errors.append(PEP_LOGGING['REQUEST_ERROR'].format(
-                version_link, str(e)))
-        except ParserFindTagException as e:
-            errors.append(PEP_LOGGING['TAG_ERROR'].format(
-                version_link, str(e)))
+    bar = make_progress(len(section_by_python), 'whats-new', progress)
+    with ThreadPoolExecutor(max_workers=workers or WHATS_NEW_WORKERS) as ex:
+        futures = [
+            ex.submit(_fetch_whats_new_entry, session, whats_new_url, section)
+            for section in section_by_python
+        ]
+        for future in futures:
+            future.add_done_callback(lambda _: bar.update())
+        for future in futures:
+            entry = future.result()
+            if isinstance(entry, CrawlError):
+                errors.append(entry)
+            elif entry is not None:
+                results.append(entry)
+    bar.close()
 
     if errors:
         logging.error(PEP_LOGGING['ERRORS_HEADER'])
         for error in errors:
-            logging.error(error, exc_info=True)
+            logging.error(error)
 
     return results
 
 
-def latest_versions(session):
-    soup = get_soup(session, MAIN_DOC_URL)
+def _extract_versions(soup):
     div = find_tag(soup, 'div', {'class': 'sphinxsidebarwrapper'})
-    ul_tags = div.find_all('ul')
-
-    for ul in ul_tags:
-        if 'All versions' in ul.text:
-            a_tags = ul.find_all('a')
-            break
-    else:
-        raise ParserFindTagException('Не найден список версий на странице')
+    all_versions = div.find('a', string=re.compile('All versions'))
+    ul = all_versions.find_parent('ul') if all_versions else None
+    if ul is None:
+        raise parse_error('Не найден список версий на странице')
 
-    results = []
-    pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
-    for a_tag in a_tags:
-        text_match = re.search(pattern, a_tag.text)
+    versions = []
+    for a_tag in ul.find_all('a'):
+        text = a_tag.get_text()
+        text_match = VERSION_PATTERN.search(text)
 
         if text_match is not None:
             version, status = text_match.groups()
         else:
-            version, status = a_tag.text, ''
+            version, status = text, ''
 
-        results.append(
-            (a_tag['href'], version, status)
+        versions.append(
+            [a_tag['href'], version, status]
         )
-    return results
+    return versions
+
+
+def _load_versions_cache():
+    try:
+        with open(VERSIONS_CACHE, encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - cached['fetched_at'] > VERSIONS_TTL:
+        return None
+    return cached['versions']
+
+
+def _save_versions_cache(versions):
+    STATE_DIR.mkdir(exist_ok=True)
+    with open(VERSIONS_CACHE, 'w', encoding='utf-8') as f:
+        json.dump({'fetched_at': time.time(), 'versions': versions}, f,
+                  ensure_ascii=False)
+
+
+def latest_versions(session):
+    versions = _load_versions_cache()
+    if versions is None:
+        versions = get_extracted(
+            session, MAIN_DOC_URL, 'versions', _extract_versions,
+            parse_only=SoupStrainer(
+                'div', attrs={'class': 'sphinxsidebarwrapper'})
+        )
+        _save_versions_cache(versions)
+    return [
+        ('Ссылка на документацию', 'Версия', 'Статус'),
+        *sorted(
+            (VersionEntry(*version) for version in versions),
+            key=lambda entry: entry.sort_key, reverse=True
+        )
+    ]
 
 
 def download(session):
@@ -87,17 +166,17 @@ def download(session):
     soup = get_soup(session, download_url)
 
     archive_tag = soup.select_one(
-        'table.docutils a[href$="pdf-a4.zip"]')['href']
+        'table.docutils a[href$="pdf-a4.zip"]')
     if archive_tag is None:
-        raise ParserFindTagException('Не найден тег для PDF A4 на странице')
-    archive_url = urljoin(download_url, archive_tag)
+        raise parse_error('Не найден тег для PDF A4 на странице')
+    archive_url = urljoin(download_url, archive_tag['href'])
 
     filename = archive_url.split('/')[-1]
     downloads_dir = BASE_DIR / 'downloads'
     downloads_dir.mkdir(exist_ok=True)
     archive_path = downloads_dir / filename
 
-    response = session.get(archive_url)
+    response = get_response(session, archive_url)
     with archive_path.open('wb') as f:
         f.write(response.content)
 
@@ -106,98 +185,508 @@ def download(session):
     )
 
 
-def _log_pep_errors(errors, unknown_abbr, dif_statuses):
+def _log_pep_errors(errors, unknown_abbr, dif_statuses, verbose=False):
     if errors:
         logging.error(PEP_LOGGING['ERRORS_HEADER'])
         for error in errors:
-            logging.error(error, exc_info=True)
+            logging.error(error)
+
+    logging.info(PEP_LOGGING['PEP_SUMMARY'].format(
+        len(errors), len(unknown_abbr), len(dif_statuses)))
 
+    if not verbose:
+        return
     logging.info(PEP_LOGGING['UNKNOWN_ABBR_HEADER'])
-    for abbr in unknown_abbr:
-        logging.info(abbr)
+    for record in unknown_abbr:
+        logging.info(record.unknown_message())
 
     logging.info(PEP_LOGGING['DIF_STATUSES_HEADER'])
-    for status in dif_statuses:
-        logging.info(status)
+    for record in dif_statuses:
+        logging.info(record.mismatch_message())
 
 
-def _process_pep_row(
-        row, session, status_counts, dif_statuses, unknown_abbr, errors):
-    try:
-        cells = row.find_all('td')
-        pep_status = (find_tag(cells[0], 'abbr').text
-                      if find_tag(cells[0], 'abbr') else '')
-        pep_href = find_tag(cells[1], 'a')['href']
-
-        specific = urljoin(PEP, pep_href)
-        soup = get_soup(session, specific)
-        if soup is None:
-            errors.append(PEP_LOGGING['EMPTY_RESPONSE'].format(
-                specific)
-            )
-            return
-
-        section = find_tag(soup, 'section',
-                           attrs={'id': 'pep-content'})
-        dl = find_tag(section, 'dl')
-        pattern = r'Status'
-        for dt in dl.find_all('dt'):
-            if re.search(pattern, dt.get_text()):
-                status_dd = dt.find_next_sibling('dd').get_text()
-
-        status_counts[status_dd] += 1
-
-        letter = pep_status[-1] if pep_status else ''
-        if letter in EXPECTED_STATUS.keys():
-            if status_dd not in EXPECTED_STATUS[letter]:
-                dif_statuses.append(
-                    PEP_LOGGING['DIF_STATUSES'].format(
-                        specific, status_dd, EXPECTED_STATUS[letter]
-                    )
-                )
+def _parse_pep_row(row):
+    cells = row.find_all('td')
+    abbr = cells[0].find('abbr')
+    pep_status = abbr.text if abbr else ''
+    pep_href = find_tag(cells[1], 'a')['href']
+    letter = pep_status[-1] if pep_status else ''
+    return letter, urljoin(PEP, pep_href)
+
+
+def _pep_row_number(row):
+    cells = row.find_all('td')
+    return int(find_tag(cells[1], 'a').text)
+
+
+def _select_pep_rows(rows, pep_range=None, shard=None):
+    if pep_range is None and shard is None:
+        return rows
+    selected = []
+    for row in rows:
+        try:
+            number = _pep_row_number(row)
+        except (ParserFindTagException, ValueError):
+            continue
+        if pep_range is not None and not (
+                pep_range[0] <= number <= pep_range[1]):
+            continue
+        if shard is not None and number % shard[1] != shard[0] - 1:
+            continue
+        selected.append(row)
+    return selected
+
+
+def _estimate_pep_row(row):
+    letter, specific = _parse_pep_row(row)
+    abbr = row.find_all('td')[0].find('abbr')
+    title = abbr.get('title', '') if abbr else ''
+    if ', ' in title:
+        status = title.rsplit(', ', 1)[-1]
+    else:
+        status = EXPECTED_STATUS.get(letter, ('',))[0]
+    return letter, specific, status
+
+
+def _load_pep_snapshot():
+    if not PEP_INDEX_SNAPSHOT.exists():
+        return None
+    with open(PEP_INDEX_SNAPSHOT, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_pep_snapshot(snapshot):
+    STATE_DIR.mkdir(exist_ok=True)
+    with open(PEP_INDEX_SNAPSHOT, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+
+
+def _wilson_lower_bound(successes, total, z=1.96):
+    if not total:
+        return 0.0
+    share = successes / total
+    denominator = 1 + z ** 2 / total
+    centre = share + z ** 2 / (2 * total)
+    margin = z * math.sqrt(
+        share * (1 - share) / total + z ** 2 / (4 * total ** 2))
+    return (centre - margin) / denominator
+
+
+def _pep_estimate(session, rows, verify_sample, verify_changed, table,
+                  errors):
+    estimates = []
+    for row in rows:
+        try:
+            estimates.append(_estimate_pep_row(row))
+        except ParserFindTagException as e:
+            errors.append(CrawlError(PEP, 'TAG_ERROR', e))
+
+    snapshot = _load_pep_snapshot()
+    sample = set(random.sample(
+        range(len(estimates)), min(verify_sample, len(estimates))))
+    changed = set()
+    if verify_changed and snapshot is None:
+        logging.info(PEP_LOGGING['SNAPSHOT_BASELINE'])
+    elif verify_changed:
+        changed = {
+            index for index, (_, specific, status) in enumerate(estimates)
+            if snapshot.get(specific) != status
+        }
+    snapshot = snapshot or {}
+
+    to_verify = sample | changed
+    matches = verified = 0
+    for index, (letter, specific, status) in enumerate(estimates):
+        snapshot[specific] = status
+        if index in to_verify and not run_control.should_stop():
+            status_dd = _fetch_pep_status(session, specific, errors)
+            if status_dd is not None:
+                if index in sample:
+                    verified += 1
+                    matches += status_dd == status
+                status = status_dd
+        table.append(letter, specific, status)
+    _save_pep_snapshot(snapshot)
+
+    logging.info(PEP_LOGGING['ESTIMATE_CONFIDENCE'].format(
+        len(estimates), verified, matches,
+        _wilson_lower_bound(matches, verified), len(changed)))
+
+
+def _read_pep_scopes(path, header):
+    if Path(path).stem.endswith(INCOMPLETE_SUFFIX):
+        raise ResultsMergeException(
+            PEP_LOGGING['MERGE_INCOMPLETE'].format(path))
+    scopes = parse_pep_scopes(header)
+    if scopes is None:
+        raise ResultsMergeException(PEP_LOGGING['MERGE_NOT_PEP'].format(path))
+    if not scopes:
+        raise ResultsMergeException(
+            PEP_LOGGING['MERGE_NOT_SHARD'].format(path))
+    return scopes
+
+
+def _scopes_disjoint(first, second):
+    (first_range, first_shard), (second_range, second_shard) = first, second
+    if first_range is not None and second_range is not None and (
+            first_range[1] < second_range[0]
+            or second_range[1] < first_range[0]):
+        return True
+    return (
+        first_shard is not None and second_shard is not None
+        and first_shard[1] == second_shard[1]
+        and first_shard[0] != second_shard[0]
+    )
+
+
+def _merge_pep_results(paths):
+    status_counts = defaultdict(int)
+    scopes = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            rows = list(csv.reader(f, dialect='unix'))
+        for scope in _read_pep_scopes(path, rows[0]):
+            for other_path, other_scope in scopes:
+                if not _scopes_disjoint(scope, other_scope):
+                    raise ResultsMergeException(
+                        PEP_LOGGING['MERGE_OVERLAP'].format(other_path, path))
+            scopes.append((path, scope))
+        for status, count in rows[1:-1]:
+            status_counts[status] += int(count)
+
+    return status_counts, _combine_scopes([scope for _, scope in scopes])
+
+
+def _combine_scopes(scopes):
+    """Объединённая часть PEP для заголовка результата --merge.
+
+    Шарды одного диапазона, покрывающие его целиком, сворачиваются в
+    сам диапазон; полный набор шардов без диапазона — в полный запуск
+    (пустой список). Если в наборе шардов есть пропуски, результат
+    помечается неполным.
+    """
+    shards_by_range = defaultdict(set)
+    for pep_range, shard in scopes:
+        shards_by_range[pep_range].add(shard)
+    combined = []
+    missing = []
+    for pep_range in sorted(shards_by_range, key=lambda key: key or (0, 0)):
+        shards = shards_by_range[pep_range]
+        if None in shards:
+            combined.append((pep_range, None))
+            continue
+        count = next(iter(shards))[1]
+        absent = set(range(1, count + 1)) - {index for index, _ in shards}
+        if absent:
+            combined.extend((pep_range, shard) for shard in sorted(shards))
+            missing.extend(
+                pep_scope_label(pep_range, (index, count))
+                for index in sorted(absent))
         else:
-            unknown_abbr.append(
-                PEP_LOGGING['UNKNOWN_ABBR'].format(
-                    f'{letter} (PEP: {specific})'
-                )
-            )
+            combined.append((pep_range, None))
+    if missing:
+        run_control.mark_incomplete(
+            PEP_LOGGING['MERGE_MISSING_SHARDS'].format('; '.join(missing)))
+    if combined == [(None, None)]:
+        return []
+    return combined
+
+
+def _extract_pep_status(soup):
+    section = find_tag(soup, 'section',
+                       attrs={'id': 'pep-content'})
+    dl = find_tag(section, 'dl')
+    pattern = r'Status'
+    for dt in dl.find_all('dt'):
+        if re.search(pattern, dt.get_text()):
+            dd = dt.find_next_sibling('dd')
+            if dd is not None:
+                return dd.get_text()
+    raise parse_error('Не найден статус в карточке PEP')
+
+
+def _fetch_pep_status(session, specific, errors):
+    try:
+        status_dd = get_extracted(
+            session, specific, 'pep_status', _extract_pep_status)
+        if status_dd is None:
+            errors.append(CrawlError(specific, 'EMPTY_RESPONSE', ''))
+        return status_dd
 
     except RequestException as e:
-        errors.append(PEP_LOGGING['REQUEST_ERROR'].format(
-            specific, str(e))
-        )
+        errors.append(CrawlError(specific, 'REQUEST_ERROR', e))
     except ParserFindTagException as e:
-        errors.append(PEP_LOGGING['TAG_ERROR'].format(
-            specific, str(e))
-        )
+        errors.append(CrawlError(specific, 'TAG_ERROR', e))
+    return None
 
 
-def pep(session):
-    errors = []
+def _process_pep_row(row, session, table, errors):
+    try:
+        letter, specific = _parse_pep_row(row)
+    except ParserFindTagException as e:
+        errors.append(CrawlError(PEP, 'TAG_ERROR', e))
+        return
 
-    soup = get_soup(session, PEP)
-    section = find_tag(soup, 'section', attrs={'id': 'numerical-index'})
-    tbody = find_tag(section, 'tbody')
+    status_dd = _fetch_pep_status(session, specific, errors)
+    if status_dd is not None:
+        table.append(letter, specific, status_dd)
+
+
+def _worker_name(pid):
+    return f'{socket.gethostname()}:{pid}'
 
-    status_counts = defaultdict(int)
-    dif_statuses = []
-    unknown_abbr = []
 
-    for row in tqdm(tbody.find_all('tr'), desc='Парсим данные...'):
-        _process_pep_row(
-            row, session, status_counts, dif_statuses,
-            unknown_abbr, errors
+def _worker_error(kind, details):
+    return json.dumps([kind, str(details)], ensure_ascii=False)
+
+
+def _process_pep_task(session, specific):
+    errors = []
+    try:
+        status_dd = _fetch_pep_status(session, specific, errors)
+    except Exception as e:
+        return None, _worker_error('WORKER_ERROR', repr(e))
+    if errors:
+        return status_dd, _worker_error(errors[0].kind, errors[0].details)
+    return status_dd, None
+
+
+def pep_worker(queue_path):
+    metrics.reset()
+    session = requests_cache.CachedSession()
+    queue = SqliteWorkQueue(queue_path)
+    worker_name = _worker_name(os.getpid())
+    while not run_control.should_stop():
+        state = queue.state()
+        if state == QUEUE_STOPPED:
+            break
+        task = queue.claim(worker_name)
+        if task is None:
+            if state == QUEUE_CLOSED:
+                break
+            time.sleep(QUEUE_POLL_INTERVAL)
+            continue
+        task_id, _, specific = task
+        queue.complete(task_id, *_process_pep_task(session, specific))
+    queue.add_metrics(metrics.counters())
+    queue.close()
+
+
+def _local_pep_worker(queue_path, log_queue):
+    """Воркер, запущенный координатором на том же узле.
+
+    Ctrl+C посылает SIGINT всей группе процессов. Локальный воркер его
+    игнорирует и останавливается по состоянию очереди или по SIGTERM
+    координатора, дописав текущую задачу и передав счётчики. Лог воркера
+    уходит координатору через log_queue.
+    """
+    configure_worker_logging(log_queue)
+    run_control.install_signal_handlers()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    pep_worker(queue_path)
+
+
+def _start_pep_worker(queue_path, log_queue):
+    process = multiprocessing.Process(
+        target=_local_pep_worker, args=(queue_path, log_queue))
+    process.start()
+    return process
+
+
+def _replace_dead_workers(queue, queue_path, log_queue, processes,
+                          restarts_left):
+    for index, process in enumerate(processes):
+        if process.is_alive() or process.exitcode == 0:
+            continue
+        logging.warning(PEP_LOGGING['WORKER_DIED'].format(
+            process.pid, process.exitcode))
+        queue.release(
+            _worker_name(process.pid),
+            _worker_error('WORKER_ERROR', f'exit code {process.exitcode}'),
+            QUEUE_MAX_ATTEMPTS
         )
+        if restarts_left:
+            processes[index] = _start_pep_worker(queue_path, log_queue)
+            restarts_left -= 1
+    return restarts_left
+
+
+def _stop_pep_workers(queue, processes):
+    queue.stop()
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    deadline = time.monotonic() + WORKER_SHUTDOWN_TIMEOUT
+    for process in processes:
+        process.join(max(0, deadline - time.monotonic()))
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+
+def _pep_distributed(rows, workers, queue_path, progress):
+    queue = SqliteWorkQueue(queue_path)
+    queue.reset()
+    errors = []
+    tasks = []
+    for row in rows:
+        try:
+            tasks.append(_parse_pep_row(row))
+        except ParserFindTagException as e:
+            errors.append(CrawlError(PEP, 'TAG_ERROR', e))
+    queue.put_many(tasks)
+    logging.info(PEP_LOGGING['QUEUE_FILLED'].format(
+        queue_path, len(tasks), workers))
+
+    log_queue, log_listener = start_worker_logging()
+    processes = [
+        _start_pep_worker(queue_path, log_queue) for _ in range(workers)]
+    restarts_left = workers * QUEUE_MAX_ATTEMPTS
+    bar = make_progress(len(tasks), 'pep', progress)
+    stopped = False
+    while True:
+        unfinished = queue.unfinished_count()
+        bar.set(len(tasks) - unfinished)
+        if not unfinished:
+            break
+        if run_control.should_stop():
+            stopped = True
+            break
+        restarts_left = _replace_dead_workers(
+            queue, queue_path, log_queue, processes, restarts_left)
+        if processes and not any(p.is_alive() for p in processes):
+            logging.error(PEP_LOGGING['WORKERS_EXHAUSTED'])
+            stopped = True
+            break
+        time.sleep(QUEUE_POLL_INTERVAL)
+        queue.requeue_stale(QUEUE_STALE_TIMEOUT)
+    bar.close()
+    if stopped:
+        run_control.mark_incomplete()
+        _stop_pep_workers(queue, processes)
+    else:
+        queue.finish()
+        for process in processes:
+            process.join()
+    log_listener.stop()
+    log_queue.close()
+
+    metrics.add_counters(queue.metrics())
+    results = queue.results()
+    queue.close()
+    return results, errors
 
-    _log_pep_errors(errors, unknown_abbr, dif_statuses)
 
+def _pep_table(status_counts, scopes=()):
     return [
-        ('Статус', 'Количество'),
+        pep_count_header(scopes),
         *sorted(status_counts.items()),
         ('Всего', sum(status_counts.values()))
     ]
 
 
+def _pep_collect(session, rows, workers, queue, progress, table, errors):
+    if workers > 1 or queue is not None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            queue_path = queue or Path(temp_dir) / 'pep_queue.sqlite3'
+            results, queue_errors = _pep_distributed(
+                rows, workers, queue_path, progress)
+        errors.extend(queue_errors)
+        for letter, specific, status_dd, error in results:
+            if error is not None:
+                errors.append(CrawlError(specific, *json.loads(error)))
+            if status_dd is not None:
+                table.append(letter, specific, status_dd)
+        return
+
+    bar = make_progress(len(rows), 'pep', progress)
+    for row in rows:
+        if run_control.should_stop():
+            run_control.mark_incomplete()
+            break
+        _process_pep_row(row, session, table, errors)
+        bar.update()
+    bar.close()
+
+
+def _load_pep_rows():
+    if not PEP_ROWS_SNAPSHOT.exists():
+        return {}
+    with open(PEP_ROWS_SNAPSHOT, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _update_pep_rows(previous, pep_rows, full, failed):
+    if full:
+        snapshot = {
+            url: fields for url, fields in previous.items() if url in failed}
+    else:
+        snapshot = dict(previous)
+    snapshot.update(
+        (url, [letter, status]) for url, letter, status in pep_rows)
+    STATE_DIR.mkdir(exist_ok=True)
+    with open(PEP_ROWS_SNAPSHOT, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+
+
+def _pep_rows_diff(previous, pep_rows, partial, failed):
+    previous_rows = [
+        (url, *fields) for url, fields in previous.items()
+        if url not in failed
+    ]
+    return diff_results(
+        [PEP_ROWS_HEADER, *previous_rows], [PEP_ROWS_HEADER, *pep_rows],
+        partial
+    )
+
+
+def pep(session, workers=None, queue=None, worker=False,
+        pep_range=None, shard=None, merge=None, estimate=False,
+        verify_sample=0, verify_changed=False, progress=PROGRESS_AUTO,
+        matrix=False, diff=False, verbose=False):
+    if worker:
+        pep_worker(queue)
+        return None
+    if merge:
+        return _pep_table(*_merge_pep_results(merge))
+    if workers is None:
+        workers = 1
+
+    errors = []
+
+    soup = get_soup(session, PEP)
+    section = find_tag(soup, 'section', attrs={'id': 'numerical-index'})
+    tbody = find_tag(section, 'tbody')
+
+    table = PepTable()
+    rows = _select_pep_rows(tbody.find_all('tr'), pep_range, shard)
+    if estimate:
+        _pep_estimate(session, rows, verify_sample, verify_changed, table,
+                      errors)
+    else:
+        _pep_collect(session, rows, workers, queue, progress, table, errors)
+
+    analysis = analyze_pep_table(table)
+    _log_pep_errors(errors, analysis.unknown, analysis.mismatches, verbose)
+    for status, count in analysis.status_counts.items():
+        metrics.set_gauge('bs4_parser_pep_status', count, status=status)
+
+    pep_rows = table.rows()
+    previous = _load_pep_rows()
+    partial = pep_range is not None or shard is not None or (
+        run_control.is_incomplete())
+    failed = {error.url for error in errors}
+    if not estimate:
+        _update_pep_rows(previous, pep_rows, not partial, failed)
+    if diff:
+        return _pep_rows_diff(previous, pep_rows, partial, failed)
+    if matrix:
+        return crosstab_table(analysis)
+    scopes = [(pep_range, shard)] if (
+        pep_range is not None or shard is not None) else []
+    return _pep_table(analysis.status_counts, scopes)
+
+
 MODE_TO_FUNCTION = {
     'whats-new': whats_new,
     'latest-versions': latest_versions,
@@ -205,31 +694,79 @@ MODE_TO_FUNCTION = {
     'pep': pep,
 }
 
+MODE_TO_OPTIONS = {
+    'whats-new': ('progress', 'workers'),
+    'pep': (
+        'workers', 'queue', 'worker', 'pep_range', 'shard', 'merge',
+        'estimate', 'verify_sample', 'verify_changed', 'progress',
+        'matrix', 'diff', 'verbose',
+    ),
+}
+
+
+def _record_run_metrics(parser_mode, duration, succeeded):
+    metrics.set_gauge('bs4_parser_mode_duration_seconds', duration,
+                      mode=parser_mode)
+    if duration:
+        metrics.set_gauge(
+            'bs4_parser_pages_per_second',
+            metrics.get('bs4_parser_requests_total') / duration,
+            mode=parser_mode
+        )
+    metrics.set_gauge('bs4_parser_last_run_success', int(succeeded),
+                      mode=parser_mode)
+    metrics.set_gauge('bs4_parser_last_run_incomplete',
+                      int(run_control.is_incomplete()), mode=parser_mode)
+    metrics.set_gauge('bs4_parser_last_run_timestamp_seconds', time.time(),
+                      mode=parser_mode)
+
 
 def main():
-    configure_logging()
+    arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
+    args = arg_parser.parse_args()
+    check_arguments(arg_parser, args)
+    log_listener = configure_logging(args.log_format)
     logging.info(PEP_LOGGING['PARSER_START'])
+    run_control.start(args.deadline)
+    run_control.install_signal_handlers()
+    started = time.monotonic()
+    succeeded = False
 
     try:
-        arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
-        args = arg_parser.parse_args()
         logging.info(PEP_LOGGING['PARSER_ARGS'].format(args))
 
         session = requests_cache.CachedSession()
         if args.clear_cache:
             session.cache.clear()
+            clear_soup_cache()
+            get_content_store().clear()
+            VERSIONS_CACHE.unlink(missing_ok=True)
 
         parser_mode = args.mode
-        results = MODE_TO_FUNCTION[parser_mode](session)
+        options = {
+            name: getattr(args, name)
+            for name in MODE_TO_OPTIONS.get(parser_mode, ())
+        }
+        results = MODE_TO_FUNCTION[parser_mode](session, **options)
 
         if results is not None:
-            control_output(results, args)
+            control_output(results, args, run_control.incomplete_reason())
+        succeeded = True
+
+        logging.info(PEP_LOGGING['SOUP_CACHE_STATS'].format(
+            soup_cache_stats['hits'], soup_cache_stats['misses']))
 
     except Exception as e:
         logging.error(PEP_LOGGING['PARSER_ERROR'].format(str(e)),
                       exc_info=True)
 
+    _record_run_metrics(args.mode, time.monotonic() - started, succeeded)
+    if args.metrics_file:
+        metrics.write_textfile(args.metrics_file)
     logging.info(PEP_LOGGING['PARSER_FINISH'])
+    log_listener.stop()
+    for handler in log_listener.handlers:
+        handler.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,85 @@
+import os
+import threading
+from collections import defaultdict
+
+from constants import METRICS
+
+_lock = threading.Lock()
+_values = defaultdict(float)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    with _lock:
+        _values[_key(name, labels)] += value
+
+
+def set_gauge(name, value, **labels):
+    with _lock:
+        _values[_key(name, labels)] = value
+
+
+def get(name, **labels):
+    with _lock:
+        return _values.get(_key(name, labels), 0)
+
+
+def reset():
+    with _lock:
+        _values.clear()
+
+
+def counters():
+    """Значения счётчиков для передачи из воркера координатору."""
+    with _lock:
+        return [
+            (name, dict(labels), value)
+            for (name, labels), value in _values.items()
+            if METRICS.get(name, ('',))[0] == 'counter'
+        ]
+
+
+def add_counters(samples):
+    for name, labels, value in samples:
+        inc(name, value, **labels)
+
+
+def _escape(value):
+    return (str(value).replace('\\', '\\\\')
+            .replace('"', '\\"').replace('\n', '\\n'))
+
+
+def _format_value(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def render():
+    with _lock:
+        values = sorted(_values.items())
+    lines = []
+    for name, (metric_type, description) in METRICS.items():
+        samples = [(labels, value) for (metric, labels), value in values
+                   if metric == name]
+        if not samples:
+            continue
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for labels, value in samples:
+            label_text = ','.join(
+                f'{label}="{_escape(text)}"' for label, text in labels)
+            lines.append(
+                f'{name}{{{label_text}}} {_format_value(value)}'
+                if label_text else f'{name} {_format_value(value)}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def write_textfile(path):
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(render())
+    os.replace(temp_path, path)
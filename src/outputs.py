@@ -1,30 +1,72 @@
 import csv
 import datetime as dt
+import hashlib
 import logging
 
 from prettytable import PrettyTable
 
-from constants import (BASE_DIR, DATETIME_FORMAT, FILE_OUTPUT,
-                       PRETTY_OUTPUT, PEP_LOGGING)
+from analysis import parse_pep_scopes, pep_scope_name
+from constants import (BASE_DIR, DATETIME_FORMAT, DIFF_LABELS, FILE_OUTPUT,
+                       INCOMPLETE_SUFFIX, PRETTY_OUTPUT, PEP_LOGGING)
 
 
-def control_output(results, cli_args):
+def control_output(results, cli_args, incomplete=False):
+    """Вывести результат режима.
+
+    incomplete — признак неполного результата; строка заменяет
+    стандартное сообщение о неполноте.
+    """
     output = cli_args.output
+    if incomplete:
+        message = (incomplete if isinstance(incomplete, str)
+                   else PEP_LOGGING['INCOMPLETE_RESULTS'])
+        logging.warning(message)
+        if output != FILE_OUTPUT:
+            print(message)
+    name = result_name(cli_args, results)
+    if is_diff(results):
+        name = f'{name}-diff'
+    elif getattr(cli_args, 'diff', False):
+        changes = diff_results(
+            load_previous_results(name), results, partial=incomplete)
+        if output == FILE_OUTPUT:
+            file_output(results, cli_args, incomplete)
+            output = None
+        results = changes
     if output == PRETTY_OUTPUT:
         pretty_output(results)
     elif output == FILE_OUTPUT:
-        file_output(results, cli_args)
+        file_output(results, cli_args, incomplete, name)
     else:
         default_output(results)
 
 
-def file_output(results, cli_args):
+def result_name(cli_args, results=None):
+    """Префикс файла результата: режим, вид таблицы и часть PEP.
+
+    Для --merge часть PEP берётся из заголовка объединённой таблицы.
+    """
+    parts = [cli_args.mode]
+    if getattr(cli_args, 'matrix', False):
+        parts.append('matrix')
+    pep_range = getattr(cli_args, 'pep_range', None)
+    shard = getattr(cli_args, 'shard', None)
+    scopes = [(pep_range, shard)]
+    if getattr(cli_args, 'merge', None) and results:
+        scopes = parse_pep_scopes(results[0]) or []
+    parts.extend(
+        pep_scope_name(*scope) for scope in scopes if any(scope))
+    return '-'.join(parts)
+
+
+def file_output(results, cli_args, incomplete=False, name=None):
     results_dir = BASE_DIR / 'results'
     results_dir.mkdir(exist_ok=True)
-    parser_mode = cli_args.mode
     now = dt.datetime.now()
     now_formatted = now.strftime(DATETIME_FORMAT)
-    file_name = f'{parser_mode}_{now_formatted}.csv'
+    suffix = INCOMPLETE_SUFFIX if incomplete else ''
+    name = name or result_name(cli_args, results)
+    file_name = f'{name}_{now_formatted}{suffix}.csv'
     file_path = results_dir / file_name
 
     with open(file_path, 'w', encoding='utf-8') as f:
@@ -34,6 +76,61 @@ def file_output(results, cli_args):
     logging.info(PEP_LOGGING['FILE_SAVE'].format(file_path))
 
 
+def load_previous_results(name):
+    results_dir = BASE_DIR / 'results'
+    previous = sorted(
+        path for path in results_dir.glob(f'{name}_*.csv')
+        if not path.stem.endswith(INCOMPLETE_SUFFIX)
+    )
+    if not previous:
+        return []
+    with open(previous[-1], encoding='utf-8') as f:
+        return [tuple(row) for row in csv.reader(f, dialect='unix')]
+
+
+def _row_hash(row):
+    return hashlib.sha1('\x1f'.join(row).encode('utf-8')).hexdigest()
+
+
+def _hash_rows(rows):
+    return {
+        row[0]: (_row_hash(row), row)
+        for row in (tuple(str(cell) for cell in row) for row in rows[1:])
+    }
+
+
+def is_diff(results):
+    """Результат режима уже является списком изменений."""
+    return bool(results) and results[0][0] == DIFF_LABELS['HEADER']
+
+
+def diff_results(previous, current, partial=False):
+    """Изменения между таблицами по ключу в первом столбце.
+
+    partial — текущая таблица покрывает не все строки (часть PEP или
+    прерванный запуск), поэтому отсутствующие строки не считаются
+    удалёнными.
+    """
+    header = tuple(str(cell) for cell in current[0])
+    old_rows = _hash_rows(previous)
+    new_rows = _hash_rows(current)
+    changes = [(DIFF_LABELS['HEADER'], *header)]
+    for key, (row_hash, row) in new_rows.items():
+        if key not in old_rows:
+            changes.append((DIFF_LABELS['ADDED'], *row))
+        elif old_rows[key][0] != row_hash:
+            old_row = old_rows[key][1]
+            changes.append((DIFF_LABELS['CHANGED'], *(
+                new if old == new else f'{old} → {new}'
+                for old, new in zip(old_row, row)
+            )))
+    for key, (_, row) in old_rows.items():
+        if key not in new_rows and not partial:
+            changes.append((DIFF_LABELS['REMOVED'], *row))
+    logging.info(PEP_LOGGING['DIFF_SUMMARY'].format(len(changes) - 1))
+    return changes
+
+
 def default_output(results):
     for row in results:
         print(*row)
@@ -43,5 +140,5 @@ def pretty_output(results):
     table = PrettyTable()
     table.field_names = results[0]
     table.align = 'l'
-    table.add_rows(results[1:])
+    table.add_rows([list(row) for row in results[1:]])
     print(table)
@@ -0,0 +1,89 @@
+import logging
+import sys
+import threading
+import time
+
+from tqdm import tqdm
+
+from constants import (PEP_LOGGING, PROGRESS_AUTO, PROGRESS_BAR,
+                       PROGRESS_INTERVAL, PROGRESS_LOG)
+
+
+class NullProgress:
+    """Прогресс, который ничего не делает."""
+
+    def update(self, count=1):
+        pass
+
+    def set(self, done):
+        pass
+
+    def close(self):
+        pass
+
+
+class BarProgress(NullProgress):
+    """Прогресс-бар tqdm с ограниченной частотой обновления."""
+
+    def __init__(self, total, desc):
+        self._lock = threading.Lock()
+        self._bar = tqdm(total=total, desc=desc,
+                         mininterval=PROGRESS_INTERVAL)
+
+    def update(self, count=1):
+        with self._lock:
+            self._bar.update(count)
+
+    def set(self, done):
+        with self._lock:
+            self._bar.update(done - self._bar.n)
+
+    def close(self):
+        self._bar.close()
+
+
+class LogProgress(NullProgress):
+    """Прогресс в лог не чаще одного раза в PROGRESS_INTERVAL секунд."""
+
+    def __init__(self, total, desc):
+        self.total = total
+        self.desc = desc
+        self.done = 0
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._reported = self._started
+
+    def update(self, count=1):
+        with self._lock:
+            self.done += count
+            self._report()
+
+    def set(self, done):
+        with self._lock:
+            self.done = done
+            self._report()
+
+    def close(self):
+        with self._lock:
+            self._report(force=True)
+
+    def _report(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._reported < PROGRESS_INTERVAL:
+            return
+        self._reported = now
+        elapsed = now - self._started
+        rate = self.done / elapsed if elapsed else 0.0
+        eta = (self.total - self.done) / rate if rate else 0.0
+        logging.info(PEP_LOGGING['PROGRESS'].format(
+            self.desc, self.done, self.total, rate, eta))
+
+
+def make_progress(total, desc, mode=PROGRESS_AUTO):
+    if mode == PROGRESS_AUTO:
+        mode = PROGRESS_BAR if sys.stderr.isatty() else PROGRESS_LOG
+    if mode == PROGRESS_BAR:
+        return BarProgress(total, desc)
+    if mode == PROGRESS_LOG:
+        return LogProgress(total, desc)
+    return NullProgress()
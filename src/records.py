@@ -0,0 +1,87 @@
+from constants import EXPECTED_STATUS, PEP_LOGGING
+
+
+class Record:
+    """Базовая запись результата с __slots__.
+
+    Запись итерируется по своим полям, поэтому её можно передавать
+    в outputs наравне с кортежем и сравнивать с кортежем.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        if len(values) != len(self.__slots__):
+            raise TypeError(
+                f'{type(self).__name__} ожидает {len(self.__slots__)} '
+                f'значения, получено {len(values)}')
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __eq__(self, other):
+        try:
+            return tuple(self) == tuple(other)
+        except TypeError:
+            return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        fields = ', '.join(
+            f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+
+class WhatsNewEntry(Record):
+    __slots__ = ('link', 'title', 'editors')
+
+
+class VersionEntry(Record):
+    __slots__ = ('link', 'version', 'status')
+
+    @property
+    def sort_key(self):
+        try:
+            return tuple(int(part) for part in self.version.split('.'))
+        except ValueError:
+            return ()
+
+
+class PepRecord(Record):
+    __slots__ = ('letter', 'url', 'status')
+
+    def mismatch_message(self):
+        return PEP_LOGGING['DIF_STATUSES'].format(
+            self.url, self.status, EXPECTED_STATUS[self.letter])
+
+    def unknown_message(self):
+        return PEP_LOGGING['UNKNOWN_ABBR'].format(
+            f'{self.letter} (PEP: {self.url})')
+
+
+class CrawlError(Record):
+    """Ошибка обработки страницы; текст собирается только при выводе.
+
+    Исключение сохраняется строкой: живое исключение через __traceback__
+    удерживало бы кадры с ответом и деревом страницы до конца запуска.
+    """
+
+    __slots__ = ('url', 'kind', 'details')
+
+    def __init__(self, url, kind, details):
+        if isinstance(details, BaseException):
+            details = str(details)
+        super().__init__(url, kind, details)
+
+    def __str__(self):
+        return PEP_LOGGING[self.kind].format(self.url, self.details)
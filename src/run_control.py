@@ -0,0 +1,71 @@
+import logging
+import signal
+import threading
+import time
+
+from constants import PEP_LOGGING, REQUEST_TIMEOUT
+
+_stop = threading.Event()
+_state = {'deadline': None, 'incomplete': False, 'signal': None}
+
+
+def start(budget=None):
+    _stop.clear()
+    _state['incomplete'] = False
+    _state['signal'] = None
+    _state['deadline'] = (
+        time.monotonic() + budget if budget is not None else None)
+
+
+def remaining():
+    if _state['deadline'] is None:
+        return None
+    return _state['deadline'] - time.monotonic()
+
+
+def stop():
+    _stop.set()
+
+
+def should_stop():
+    if _stop.is_set():
+        return True
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def request_timeout():
+    left = remaining()
+    if left is None:
+        return REQUEST_TIMEOUT
+    return min(REQUEST_TIMEOUT, left)
+
+
+def mark_incomplete(reason=PEP_LOGGING['INCOMPLETE_RESULTS']):
+    if not _state['incomplete']:
+        _state['incomplete'] = reason
+
+
+def is_incomplete():
+    return bool(_state['incomplete'])
+
+
+def incomplete_reason():
+    """Сообщение о неполном результате или None для полного."""
+    return _state['incomplete'] or None
+
+
+def _handle_signal(signum, frame):
+    # Прерываем сразу только на повтор того же сигнала: SIGTERM от
+    # координатора после SIGINT группе процессов — не повторная просьба.
+    if _stop.is_set() and _state['signal'] == signum:
+        signal.default_int_handler(signum, frame)
+    _state['signal'] = signum
+    logging.warning(PEP_LOGGING['RUN_STOPPED'].format(
+        signal.Signals(signum).name))
+    stop()
+
+
+def install_signal_handlers():
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, _handle_signal)
@@ -1,24 +1,176 @@
+import atexit
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
 from bs4 import BeautifulSoup
+from requests.exceptions import Timeout
 
+import metrics
+import run_control
+from constants import (CONTENT_STORE_PATH, CONTENT_STORE_SIZE,
+                       EXTRACTOR_VERSIONS, PEP_LOGGING, SOUP_CACHE_SIZE,
+                       STATE_DIR)
+from content_store import ContentStore
 from exceptions import ParserFindTagException
 
+_soup_cache = OrderedDict()
+_soup_in_flight = {}
+_soup_lock = threading.Lock()
+soup_cache_stats = {'hits': 0, 'misses': 0}
+_content_store = None
+_content_store_pid = None
+_content_store_lock = threading.Lock()
+
+
+class _InFlight:
+    """Ожидание результата запроса, который уже выполняет другой поток."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
 
 def get_response(session, url):
-    response = session.get(url)
-    response.encoding = 'utf-8'
+    timeout = run_control.request_timeout()
+    if timeout <= 0:
+        raise Timeout(PEP_LOGGING['DEADLINE_EXCEEDED'])
+    response = session.get(url, timeout=timeout)
+    metrics.inc('bs4_parser_requests_total')
+    if getattr(response, 'from_cache', False):
+        metrics.inc('bs4_parser_cache_hits_total')
+    else:
+        metrics.inc('bs4_parser_cache_misses_total')
+        metrics.inc('bs4_parser_downloaded_bytes_total',
+                    len(response.content))
     return response
 
 
+def declared_encoding(response):
+    """Кодировка из заголовка Content-Type или None.
+
+    В отличие от response.encoding здесь нет подстановки ISO-8859-1
+    для text/*: без charset в заголовке кодировку определяет
+    BeautifulSoup по BOM и <meta charset>.
+    """
+    content_type = response.headers.get('Content-Type', '')
+    for parameter in content_type.split(';')[1:]:
+        name, _, value = parameter.partition('=')
+        if name.strip().lower() == 'charset':
+            return value.strip().strip('"\'') or None
+    return None
+
+
+def parse_error(message):
+    """ParserFindTagException, учтённое в счётчике ошибок парсинга."""
+    metrics.inc('bs4_parser_parse_errors_total')
+    return ParserFindTagException(message)
+
+
 def find_tag(soup, tag, attrs=None):
     searched_tag = soup.find(tag, attrs=(attrs or {}))
     if searched_tag is None:
         error_msg = f'Не найден тег {tag} {attrs}'
-        raise ParserFindTagException(error_msg)
+        raise parse_error(error_msg)
     return searched_tag
 
 
-def get_soup(session, url):
+def _parse_page(session, url, features):
+    response = get_response(session, url)
+    if response is None:
+        return None
+    return BeautifulSoup(
+        response.content, features,
+        from_encoding=declared_encoding(response))
+
+
+def _memoized(key, load):
+    """Результат load() по ключу: из LRU, из чужого запроса или заново.
+
+    Одновременные вызовы с одним ключом ждут единственную загрузку.
+    """
+    with _soup_lock:
+        if key in _soup_cache:
+            _soup_cache.move_to_end(key)
+            soup_cache_stats['hits'] += 1
+            return _soup_cache[key]
+        waiter = _soup_in_flight.get(key)
+        if waiter is None:
+            soup_cache_stats['misses'] += 1
+            owner = _soup_in_flight[key] = _InFlight()
+        else:
+            soup_cache_stats['hits'] += 1
+            owner = None
+
+    if owner is None:
+        waiter.done.wait()
+        if waiter.error is not None:
+            raise waiter.error
+        return waiter.value
+
+    try:
+        owner.value = load()
+    except Exception as error:
+        owner.error = error
+        raise
+    finally:
+        with _soup_lock:
+            del _soup_in_flight[key]
+            if owner.value is not None:
+                _soup_cache[key] = owner.value
+                while len(_soup_cache) > SOUP_CACHE_SIZE:
+                    _soup_cache.popitem(last=False)
+        owner.done.set()
+    return owner.value
+
+
+def get_soup(session, url, features='lxml'):
+    return _memoized(
+        ('soup', url, features),
+        lambda: _parse_page(session, url, features))
+
+
+def clear_soup_cache():
+    with _soup_lock:
+        _soup_cache.clear()
+        soup_cache_stats.update(hits=0, misses=0)
+
+
+def get_content_store():
+    global _content_store, _content_store_pid
+    with _content_store_lock:
+        if _content_store is None or _content_store_pid != os.getpid():
+            STATE_DIR.mkdir(exist_ok=True)
+            _content_store = ContentStore(
+                CONTENT_STORE_PATH, EXTRACTOR_VERSIONS, CONTENT_STORE_SIZE)
+            _content_store_pid = os.getpid()
+            atexit.register(_content_store.close)
+        return _content_store
+
+
+def _extract_page(session, url, extractor, extract, store, parse_only):
     response = get_response(session, url)
     if response is None:
         return None
-    return BeautifulSoup(response.text, 'lxml')
+    store = store or get_content_store()
+    digest = hashlib.sha256(response.content).hexdigest()
+    payload = store.get(digest, extractor)
+    if payload is not None:
+        metrics.inc('bs4_parser_content_store_hits_total')
+        return payload
+    metrics.inc('bs4_parser_content_store_misses_total')
+    payload = extract(BeautifulSoup(
+        response.content, 'lxml', from_encoding=declared_encoding(response),
+        parse_only=parse_only))
+    store.put(digest, extractor, payload)
+    return payload
+
+
+def get_extracted(session, url, extractor, extract, store=None,
+                  parse_only=None):
+    return _memoized(
+        ('extracted', url, extractor),
+        lambda: _extract_page(
+            session, url, extractor, extract, store, parse_only))
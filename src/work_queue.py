@@ -0,0 +1,163 @@
+import json
+import sqlite3
+import time
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    letter TEXT NOT NULL,
+    url TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    claimed_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    status TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS worker_metrics (
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+'''
+
+QUEUE_OPEN = 'open'
+QUEUE_CLOSED = 'closed'
+QUEUE_STOPPED = 'stopped'
+
+
+class SqliteWorkQueue:
+    """Очередь задач на SQLite, общая для координатора и воркеров.
+
+    Каждая задача — пара (буква статуса из индекса, ссылка на PEP).
+    Воркеры забирают задачи по одной и возвращают статус из карточки
+    или текст ошибки; координатор собирает результаты по порядку задач.
+
+    Пока координатор не закрыл очередь, воркер без задач ждёт новых,
+    поэтому его можно запустить раньше координатора. WAL не работает
+    на сетевых файловых системах: все процессы должны быть на одном узле.
+    """
+
+    def __init__(self, path, timeout=30):
+        self.connection = sqlite3.connect(
+            str(path), timeout=timeout, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def reset(self):
+        with self.connection:
+            self.connection.execute('DELETE FROM tasks')
+            self.connection.execute('DELETE FROM worker_metrics')
+            self._set_state(QUEUE_OPEN)
+
+    def finish(self):
+        with self.connection:
+            self._set_state(QUEUE_CLOSED)
+
+    def stop(self):
+        """Попросить воркеры не брать новые задачи и завершиться."""
+        with self.connection:
+            self._set_state(QUEUE_STOPPED)
+
+    def state(self):
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'state'").fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, state):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('state', ?)",
+            (state,)
+        )
+
+    def put_many(self, tasks):
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO tasks (letter, url) VALUES (?, ?)', tasks)
+
+    def claim(self, worker):
+        cursor = self.connection.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            task = cursor.execute(
+                "SELECT id, letter, url FROM tasks WHERE state = 'pending' "
+                'ORDER BY id LIMIT 1'
+            ).fetchone()
+            if task is not None:
+                cursor.execute(
+                    "UPDATE tasks SET state = 'taken', worker = ?, "
+                    'claimed_at = ?, attempts = attempts + 1 WHERE id = ?',
+                    (worker, time.time(), task[0])
+                )
+            cursor.execute('COMMIT')
+        except sqlite3.Error:
+            cursor.execute('ROLLBACK')
+            raise
+        return task
+
+    def complete(self, task_id, status, error=None):
+        self.connection.execute(
+            "UPDATE tasks SET state = 'done', status = ?, error = ? "
+            'WHERE id = ?',
+            (status, error, task_id)
+        )
+
+    def requeue_stale(self, timeout):
+        self.connection.execute(
+            "UPDATE tasks SET state = 'pending', worker = NULL "
+            "WHERE state = 'taken' AND claimed_at < ?",
+            (time.time() - timeout,)
+        )
+
+    def release(self, worker, error, max_attempts):
+        """Вернуть задачи упавшего воркера в очередь.
+
+        Задача, которую уже брали max_attempts раз, завершается с ошибкой,
+        чтобы страница, роняющая воркер, не перезапускала его бесконечно.
+        """
+        with self.connection:
+            self.connection.execute(
+                "UPDATE tasks SET state = 'done', error = ? "
+                "WHERE state = 'taken' AND worker = ? AND attempts >= ?",
+                (error, worker, max_attempts)
+            )
+            self.connection.execute(
+                "UPDATE tasks SET state = 'pending', worker = NULL "
+                "WHERE state = 'taken' AND worker = ?",
+                (worker,)
+            )
+
+    def unfinished_count(self):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM tasks WHERE state != 'done'"
+        ).fetchone()[0]
+
+    def results(self):
+        return self.connection.execute(
+            'SELECT letter, url, status, error FROM tasks ORDER BY id'
+        ).fetchall()
+
+    def add_metrics(self, samples):
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO worker_metrics (name, labels, value) '
+                'VALUES (?, ?, ?)',
+                [(name, json.dumps(labels, sort_keys=True), value)
+                 for name, labels, value in samples]
+            )
+
+    def metrics(self):
+        return [
+            (name, json.loads(labels), value)
+            for name, labels, value in self.connection.execute(
+                'SELECT name, labels, SUM(value) FROM worker_metrics '
+                'GROUP BY name, labels'
+            )
+        ]
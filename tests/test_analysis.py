@@ -0,0 +1,30 @@
+try:
+    from src import analysis
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `analysis.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `analysis.py`'
+
+
+def test_analyze_pep_table():
+    table = analysis.PepTable()
+    table.append('F', 'pep-1', 'Final')
+    table.append('F', 'pep-2', 'Final')
+    table.append('A', 'pep-3', 'Rejected')
+    table.append('X', 'pep-4', 'Final')
+
+    got = analysis.analyze_pep_table(table)
+    assert got.status_counts == {'Final': 3, 'Rejected': 1}
+    assert got.crosstab == {
+        ('F', 'Final'): 2, ('A', 'Rejected'): 1, ('X', 'Final'): 1}
+    assert got.mismatches == [('A', 'pep-3', 'Rejected')]
+    assert got.unknown == [('X', 'pep-4', 'Final')]
+    assert 'Ожидаемые статусы: (\'Active\', \'Accepted\')' in (
+        got.mismatches[0].mismatch_message())
+
+    assert analysis.crosstab_table(got) == [
+        ('Буква \\ Статус', 'Final', 'Rejected'),
+        ('A', 0, 1),
+        ('F', 2, 0),
+        ('X', 1, 0),
+    ]
@@ -64,3 +64,83 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('600-799', (600, 799)),
+    ('8-8', (8, 8)),
+])
+def test_pep_range_type(value, expected):
+    assert configs.pep_range_type(value) == expected
+
+
+@pytest.mark.parametrize('value', ['799-600', '600', 'a-b'])
+def test_pep_range_type_invalid(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        configs.pep_range_type(value)
+
+
+@pytest.mark.parametrize('value, valid', [
+    ('1/4', True), ('4/4', True), ('0/4', False), ('5/4', False),
+])
+def test_shard_type(value, valid):
+    if valid:
+        assert configs.shard_type(value) == tuple(
+            int(part) for part in value.split('/'))
+    else:
+        with pytest.raises(argparse.ArgumentTypeError):
+            configs.shard_type(value)
+
+
+def test_json_lines_formatter():
+    import json
+    import logging
+
+    record = logging.LogRecord(
+        'root', logging.INFO, __file__, 1, 'Статусов: %s', (3,), None)
+    got = json.loads(configs.JsonLinesFormatter().format(record))
+    assert got['level'] == 'INFO'
+    assert got['message'] == 'Статусов: 3'
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('300', 300), ('300s', 300), ('5m', 300), ('1h', 3600), ('0.5s', 0.5),
+])
+def test_duration_type(value, expected):
+    assert configs.duration_type(value) == expected
+
+
+@pytest.mark.parametrize('value', ['0', '-5s', 'soon', '5d'])
+def test_duration_type_invalid(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        configs.duration_type(value)
+
+
+def test_worker_requires_queue():
+    parser = configs.configure_argument_parser(['pep'])
+    with pytest.raises(SystemExit):
+        configs.check_arguments(parser, parser.parse_args(['pep', '--worker']))
+    configs.check_arguments(
+        parser, parser.parse_args(['pep', '--worker', '--queue', 'q.db']))
+
+
+def test_deferred_queue_handler_keeps_record_unformatted():
+    import logging
+    import queue
+
+    log_queue = queue.SimpleQueue()
+    handler = configs.DeferredQueueHandler(log_queue)
+    record = logging.LogRecord(
+        'root', logging.INFO, __file__, 1, 'Статусов: %s', (3,), None)
+    handler.handle(record)
+    queued = log_queue.get_nowait()
+    assert queued.msg == 'Статусов: %s'
+    assert queued.args == (3,)
+
+
+@pytest.mark.parametrize('extra', [['--diff'], ['--merge', 'a.csv']])
+def test_matrix_conflicts(extra):
+    parser = configs.configure_argument_parser(['pep'])
+    with pytest.raises(SystemExit):
+        configs.check_arguments(
+            parser, parser.parse_args(['pep', '--matrix', *extra]))
@@ -0,0 +1,41 @@
+try:
+    from src import content_store
+except ModuleNotFoundError:
+    assert False, (
+        'Убедитесь что в директории `src` есть файл `content_store.py`')
+except ImportError:
+    assert False, (
+        'Убедитесь что в директории `src` есть файл `content_store.py`')
+
+
+def test_content_store_roundtrip(tmp_path):
+    store = content_store.ContentStore(
+        tmp_path / 'store.sqlite3', {'pep_status': 1}, max_entries=10)
+    assert store.get('digest', 'pep_status') is None
+    store.put('digest', 'pep_status', 'Final')
+    assert store.get('digest', 'pep_status') == 'Final'
+    store.close()
+
+
+def test_content_store_version_invalidates(tmp_path):
+    path = tmp_path / 'store.sqlite3'
+    store = content_store.ContentStore(path, {'whats_new': 1}, 10)
+    store.put('digest', 'whats_new', ['Title', 'Editor'])
+    store.close()
+
+    store = content_store.ContentStore(path, {'whats_new': 2}, 10)
+    assert store.get('digest', 'whats_new') is None
+    store.close()
+
+
+def test_content_store_evicts_least_recent(tmp_path):
+    store = content_store.ContentStore(
+        tmp_path / 'store.sqlite3', {'versions': 1}, max_entries=2)
+    for digest in ('first', 'second', 'third'):
+        store.put(digest, 'versions', [])
+    store.get('first', 'versions')
+    store.evict()
+    assert store.get('second', 'versions') is None
+    assert store.get('first', 'versions') == []
+    assert store.get('third', 'versions') == []
+    store.close()
@@ -1,3 +1,5 @@
+import csv
+import json
 import pytest
 from pathlib import Path
 try:
@@ -140,3 +142,458 @@ def test_mode_to_function():
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет значения {func}'
         )
+
+
+def write_results(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        csv.writer(f, dialect='unix').writerows(rows)
+    return path
+
+
+def test_pep_merge_shard_files(tmp_path):
+    shards = [
+        [('Статус', 'Количество (шард 1/2)'), ('Active', 2), ('Final', 3),
+         ('Всего', 5)],
+        [('Статус', 'Количество (шард 2/2)'), ('Draft', 1), ('Final', 4),
+         ('Всего', 5)],
+    ]
+    paths = [
+        write_results(tmp_path / f'pep-shard-{number}-of-2.csv', rows)
+        for number, rows in enumerate(shards, 1)
+    ]
+
+    got = main.pep(None, merge=paths)
+    assert got == [
+        ('Статус', 'Количество'),
+        ('Active', 2), ('Draft', 1), ('Final', 7),
+        ('Всего', 10),
+    ]
+
+
+@pytest.mark.parametrize('headers', [
+    ('Количество (шард 1/2)', 'Количество (шард 1/2)'),
+    ('Количество (шард 1/2)', 'Количество'),
+    ('Количество (PEP 1-500)', 'Количество (PEP 400-900)'),
+    ('Количество (шард 1/2)', 'Количество (шард 1/3)'),
+])
+def test_pep_merge_rejects_overlapping_files(tmp_path, headers):
+    paths = [
+        write_results(tmp_path / f'pep_{number}.csv',
+                      [('Статус', header), ('Final', 1), ('Всего', 1)])
+        for number, header in enumerate(headers)
+    ]
+    with pytest.raises(main.ResultsMergeException):
+        main.pep(None, merge=paths)
+
+
+def test_pep_merge_keeps_range_scope(tmp_path):
+    main.run_control.start()
+    paths = [
+        write_results(tmp_path / f'pep-{number}.csv',
+                      [('Статус', header), ('Final', 1), ('Всего', 1)])
+        for number, header in enumerate((
+            'Количество (PEP 501-900)', 'Количество (PEP 1-500, шард 2/2)',
+            'Количество (PEP 1-500, шард 1/2)'))
+    ]
+    got = main.pep(None, merge=paths)
+    assert got[0] == ('Статус', 'Количество (PEP 1-500 + PEP 501-900)')
+    assert not main.run_control.is_incomplete()
+
+    remerged = main.pep(None, merge=[
+        write_results(tmp_path / 'pep-merged.csv', got),
+        write_results(tmp_path / 'pep-rest.csv', [
+            ('Статус', 'Количество (PEP 901-999)'), ('Draft', 2),
+            ('Всего', 2)]),
+    ])
+    assert remerged == [
+        ('Статус', 'Количество (PEP 1-500 + PEP 501-900 + PEP 901-999)'),
+        ('Draft', 2), ('Final', 3), ('Всего', 5),
+    ]
+
+
+def test_pep_merge_reports_missing_shards(tmp_path):
+    main.run_control.start()
+    path = write_results(tmp_path / 'pep-shard-1-of-3.csv', [
+        ('Статус', 'Количество (шард 1/3)'), ('Final', 1), ('Всего', 1)])
+    got = main.pep(None, merge=[path])
+    assert got[0] == ('Статус', 'Количество (шард 1/3)')
+    assert main.run_control.incomplete_reason() == (
+        main.PEP_LOGGING['MERGE_MISSING_SHARDS'].format(
+            'шард 2/3; шард 3/3'))
+    main.run_control.start()
+
+
+def test_pep_merge_rejects_matrix(tmp_path):
+    path = write_results(tmp_path / 'pep-matrix.csv', [
+        ('Буква \\ Статус', 'Final'), ('F', 1), ('S', 0)])
+    with pytest.raises(main.ResultsMergeException):
+        main.pep(None, merge=[path])
+
+
+@pytest.mark.parametrize('abbr, expected', [
+    ('<abbr title="Standards Track, Accepted">SA</abbr>', ('A', 'Accepted')),
+    ('<abbr title="Informational">IF</abbr>', ('F', 'Final')),
+])
+def test_estimate_pep_row(abbr, expected):
+    from bs4 import BeautifulSoup
+
+    row = BeautifulSoup(
+        f'<table><tr><td>{abbr}</td>'
+        '<td><a href="../pep-0008/">8</a></td></tr></table>',
+        'lxml'
+    ).find('tr')
+    letter, specific, status = main._estimate_pep_row(row)
+    assert (letter, status) == expected
+    assert specific == 'https://peps.python.org/pep-0008/'
+
+
+def test_wilson_lower_bound():
+    assert main._wilson_lower_bound(0, 0) == 0.0
+    assert 0.8 < main._wilson_lower_bound(50, 50) < 1.0
+    assert main._wilson_lower_bound(25, 50) < 0.5
+
+
+def test_whats_new_parallel_keeps_order(monkeypatch, tmp_path):
+    import requests
+    import requests_mock
+    from src import content_store
+
+    main.clear_soup_cache()
+    store = content_store.ContentStore(
+        tmp_path / 'store.sqlite3', {'whats_new': 1}, max_entries=100)
+    get_extracted = main.get_extracted
+    monkeypatch.setattr(
+        main, 'get_extracted',
+        lambda *args: get_extracted(*args, store=store))
+
+    whats_new_url = main.MAIN_DOC_URL + 'whatsnew/'
+    versions = [f'3.{minor}' for minor in range(12, 0, -1)]
+    items = ''.join(
+        f'<li class="toctree-l1"><a href="{version}.html">{version}</a></li>'
+        for version in versions
+    )
+    with requests_mock.Mocker() as mock:
+        mock.get(whats_new_url, text=(
+            '<section id="what-s-new-in-python">'
+            f'<div class="toctree-wrapper"><ul>{items}</ul></div></section>'
+        ))
+        for version in versions:
+            mock.get(
+                f'{whats_new_url}{version}.html',
+                text=f'<h1>Python {version}</h1><dl><dd>Editor</dd></dl>'
+            )
+        got = main.whats_new(requests.Session(), progress='none', workers=4)
+    store.close()
+
+    assert [row[1] for row in got[1:]] == [
+        f'Python {version}' for version in versions]
+
+
+def test_extract_versions_from_sidebar():
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(
+        '<div class="sphinxsidebarwrapper">'
+        '<ul><li><a href="/3/index.html">Table of contents</a></li></ul>'
+        '<ul>'
+        '<li><a href="https://docs.python.org/3.9/">Python 3.9 (EOL)</a></li>'
+        '<li><a href="https://docs.python.org/3.13/">'
+        'Python 3.13 (stable)</a></li>'
+        '<li><a href="https://www.python.org/doc/versions/">'
+        'All versions</a></li>'
+        '</ul></div>',
+        'lxml'
+    )
+    assert main._extract_versions(soup) == [
+        ['https://docs.python.org/3.9/', '3.9', 'EOL'],
+        ['https://docs.python.org/3.13/', '3.13', 'stable'],
+        ['https://www.python.org/doc/versions/', 'All versions', ''],
+    ]
+
+
+def test_latest_versions_uses_fresh_cache(monkeypatch, tmp_path):
+    import json
+    import time
+
+    cache = tmp_path / 'versions.json'
+    cache.write_text(json.dumps({
+        'fetched_at': time.time(),
+        'versions': [
+            ['https://www.python.org/doc/versions/', 'All versions', ''],
+            ['https://docs.python.org/3.9/', '3.9', 'EOL'],
+            ['https://docs.python.org/3.13/', '3.13', 'stable'],
+        ],
+    }), encoding='utf-8')
+    monkeypatch.setattr(main, 'VERSIONS_CACHE', cache)
+
+    got = main.latest_versions(session=None)
+    assert got[0] == ('Ссылка на документацию', 'Версия', 'Статус')
+    assert [entry.version for entry in got[1:]] == [
+        '3.13', '3.9', 'All versions']
+
+
+def test_latest_versions_diff_compares_newest_version(monkeypatch, tmp_path):
+    import time
+
+    cache = tmp_path / 'versions.json'
+    monkeypatch.setattr(main, 'VERSIONS_CACHE', cache)
+
+    def latest(versions):
+        cache.write_text(json.dumps(
+            {'fetched_at': time.time(), 'versions': versions}),
+            encoding='utf-8')
+        return main.latest_versions(session=None)
+
+    previous = latest([
+        ['https://docs.python.org/3.13/', '3.13', 'stable'],
+        ['https://docs.python.org/3.14/', '3.14', 'in development'],
+    ])
+    current = latest([
+        ['https://docs.python.org/3.13/', '3.13', 'stable'],
+        ['https://docs.python.org/3.14/', '3.14', 'stable'],
+        ['https://docs.python.org/3.15/', '3.15', 'in development'],
+    ])
+    assert main.diff_results(previous, current) == [
+        ('Изменение', 'Ссылка на документацию', 'Версия', 'Статус'),
+        ('Добавлено', 'https://docs.python.org/3.15/', '3.15',
+         'in development'),
+        ('Изменено', 'https://docs.python.org/3.14/', '3.14',
+         'in development → stable'),
+    ]
+
+
+def test_pep_task_survives_unexpected_error(monkeypatch):
+    def broken_fetch(session, specific, errors):
+        raise AttributeError('нет <dd>')
+
+    monkeypatch.setattr(main, '_fetch_pep_status', broken_fetch)
+    status, error = main._process_pep_task(
+        None, 'https://peps.python.org/pep-0008/')
+    assert status is None
+    assert json.loads(error)[0] == 'WORKER_ERROR'
+
+
+def test_dead_worker_is_replaced(monkeypatch, tmp_path):
+    from src import work_queue
+
+    class FakeProcess:
+        def __init__(self, pid, exitcode):
+            self.pid = pid
+            self.exitcode = exitcode
+
+        def is_alive(self):
+            return self.exitcode is None
+
+    queue = work_queue.SqliteWorkQueue(tmp_path / 'queue.sqlite3')
+    queue.put_many([('F', 'https://peps.python.org/pep-0001/')])
+    task = queue.claim(main._worker_name(101))
+    monkeypatch.setattr(
+        main, '_start_pep_worker', lambda *args: FakeProcess(102, None))
+
+    processes = [FakeProcess(101, 1)]
+    restarts_left = main._replace_dead_workers(
+        queue, tmp_path / 'queue.sqlite3', None, processes, restarts_left=1)
+    assert restarts_left == 0
+    assert processes[0].pid == 102
+    assert queue.claim('worker-2') == task
+    queue.close()
+
+
+def test_verify_changed_uses_missing_snapshot_as_baseline(
+        monkeypatch, tmp_path):
+    from bs4 import BeautifulSoup
+
+    monkeypatch.setattr(main, 'STATE_DIR', tmp_path)
+    monkeypatch.setattr(main, 'PEP_INDEX_SNAPSHOT', tmp_path / 'pep.json')
+    fetched = []
+
+    def fetch(session, specific, errors):
+        fetched.append(specific)
+        return 'Accepted'
+
+    monkeypatch.setattr(main, '_fetch_pep_status', fetch)
+
+    def index_rows(status_of_pep_8):
+        return BeautifulSoup(
+            '<table>'
+            f'<tr><td><abbr title="Standards Track, {status_of_pep_8}">S'
+            '</abbr></td><td><a href="../pep-0008/">8</a></td></tr>'
+            '<tr><td><abbr title="Informational, Final">IF</abbr></td>'
+            '<td><a href="../pep-0009/">9</a></td></tr>'
+            '</table>', 'lxml'
+        ).find_all('tr')
+
+    main._pep_estimate(None, index_rows('Draft'), 0, True,
+                       main.PepTable(), [])
+    assert fetched == []
+
+    table = main.PepTable()
+    main._pep_estimate(None, index_rows('Accepted'), 0, True, table, [])
+    assert fetched == ['https://peps.python.org/pep-0008/']
+    assert len(table) == 2
+
+
+@pytest.fixture
+def pep_site(monkeypatch, tmp_path):
+    import requests_mock
+    from src import content_store
+
+    monkeypatch.setattr(main, 'STATE_DIR', tmp_path)
+    monkeypatch.setattr(main, 'PEP_ROWS_SNAPSHOT', tmp_path / 'rows.json')
+    store = content_store.ContentStore(
+        tmp_path / 'store.sqlite3', {'pep_status': 1}, max_entries=100)
+    get_extracted = main.get_extracted
+    monkeypatch.setattr(
+        main, 'get_extracted',
+        lambda *args, **kwargs: get_extracted(*args, store=store, **kwargs))
+    main.clear_soup_cache()
+    main.run_control.start()
+
+    def serve(mock, statuses):
+        rows = ''.join(
+            f'<tr><td><abbr>S{letter}</abbr></td>'
+            f'<td><a href="../pep-{number:04d}/">{number}</a></td></tr>'
+            for number, (letter, _) in statuses.items()
+        )
+        mock.get(main.PEP, text=(
+            '<section id="numerical-index"><table><tbody>'
+            f'{rows}</tbody></table></section>'))
+        for number, (_, status) in statuses.items():
+            mock.get(
+                f'https://peps.python.org/pep-{number:04d}/',
+                text=('<section id="pep-content"><dl><dt>Status</dt>'
+                      f'<dd>{status}</dd></dl></section>'))
+
+    with requests_mock.Mocker() as mock:
+        yield lambda statuses: serve(mock, statuses)
+    main.clear_soup_cache()
+    main.run_control.start()
+    store.close()
+
+
+def test_pep_diff_reports_individual_peps(pep_site):
+    import requests
+
+    pep_site({8: ('', 'Draft'), 9: ('F', 'Final'), 10: ('R', 'Rejected')})
+    main.pep(requests.Session(), progress='none')
+
+    main.clear_soup_cache()
+    pep_site({8: ('A', 'Accepted'), 9: ('F', 'Final'), 11: ('', 'Draft')})
+    got = main.pep(requests.Session(), progress='none', diff=True)
+    assert got == [
+        ('Изменение', 'Ссылка на PEP', 'Буква', 'Статус'),
+        ('Изменено', 'https://peps.python.org/pep-0008/', 'S → A',
+         'Draft → Accepted'),
+        ('Добавлено', 'https://peps.python.org/pep-0011/', 'S', 'Draft'),
+        ('Удалено', 'https://peps.python.org/pep-0010/', 'R', 'Rejected'),
+    ]
+
+    main.clear_soup_cache()
+    got = main.pep(requests.Session(), progress='none', diff=True,
+                   pep_range=(9, 9))
+    assert got == [('Изменение', 'Ссылка на PEP', 'Буква', 'Статус')]
+
+
+def test_pep_stops_midway(pep_site, monkeypatch):
+    import requests
+
+    pep_site({8: ('F', 'Final'), 9: ('F', 'Final'), 10: ('F', 'Final')})
+    process_pep_row = main._process_pep_row
+
+    def stop_after_first(*args):
+        process_pep_row(*args)
+        main.run_control.stop()
+
+    monkeypatch.setattr(main, '_process_pep_row', stop_after_first)
+    got = main.pep(requests.Session(), progress='none')
+    assert got[-1] == ('Всего', 1)
+    assert main.run_control.is_incomplete()
+
+
+def test_stop_forwards_to_workers(tmp_path):
+    from src import work_queue
+
+    class FakeProcess:
+        def __init__(self):
+            self.signals = []
+
+        def is_alive(self):
+            return 'kill' not in self.signals
+
+        def terminate(self):
+            self.signals.append('terminate')
+
+        def join(self, timeout=None):
+            self.signals.append('join')
+
+        def kill(self):
+            self.signals.append('kill')
+
+    queue = work_queue.SqliteWorkQueue(tmp_path / 'queue.sqlite3')
+    queue.reset()
+    process = FakeProcess()
+    main._stop_pep_workers(queue, [process])
+    assert queue.state() == work_queue.QUEUE_STOPPED
+    assert process.signals == ['terminate', 'join', 'kill', 'join']
+    queue.close()
+
+
+def test_worker_finishes_task_after_group_interrupt(
+        monkeypatch, tmp_path, caplog):
+    import logging
+    import multiprocessing
+    import os
+    import signal
+    import time
+    from src import work_queue
+
+    started = multiprocessing.Event()
+
+    def slow_fetch(session, specific, errors):
+        started.set()
+        logging.warning('Загружаю %s', specific)
+        main.metrics.inc('bs4_parser_requests_total')
+        time.sleep(1)
+        return 'Final'
+
+    monkeypatch.setattr(main, '_fetch_pep_status', slow_fetch)
+    monkeypatch.chdir(tmp_path)
+    queue_path = tmp_path / 'queue.sqlite3'
+    queue = work_queue.SqliteWorkQueue(queue_path)
+    queue.reset()
+    queue.put_many([('F', 'https://peps.python.org/pep-0001/'),
+                    ('F', 'https://peps.python.org/pep-0002/')])
+
+    caplog.set_level(logging.INFO)
+    log_queue, log_listener = main.start_worker_logging()
+    process = main._start_pep_worker(queue_path, log_queue)
+    assert started.wait(10)
+    # Ctrl+C в терминале доставляет SIGINT и воркеру, затем координатор
+    # посылает ему SIGTERM.
+    os.kill(process.pid, signal.SIGINT)
+    time.sleep(0.1)
+    main._stop_pep_workers(queue, [process])
+    log_listener.stop()
+
+    assert process.exitcode == 0
+    assert (f'Воркер {process.pid}: Загружаю '
+            'https://peps.python.org/pep-0001/') in caplog.text
+    assert queue.results() == [
+        ('F', 'https://peps.python.org/pep-0001/', 'Final', None),
+        ('F', 'https://peps.python.org/pep-0002/', None, None),
+    ]
+    assert queue.metrics() == [('bs4_parser_requests_total', {}, 1.0)]
+    queue.close()
+
+
+def test_pep_mismatches_logged_only_when_verbose(caplog):
+    import logging
+    from src import records
+
+    mismatch = records.PepRecord(
+        'F', 'https://peps.python.org/pep-0008/', 'Active')
+    caplog.set_level(logging.INFO)
+    main._log_pep_errors([], [], [mismatch])
+    assert 'pep-0008' not in caplog.text
+    main._log_pep_errors([], [], [mismatch], verbose=True)
+    assert 'pep-0008' in caplog.text
@@ -0,0 +1,41 @@
+try:
+    from src import metrics
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+
+
+def test_render_prometheus_text(tmp_path):
+    metrics.reset()
+    metrics.inc('bs4_parser_requests_total')
+    metrics.inc('bs4_parser_requests_total', 2)
+    metrics.set_gauge('bs4_parser_pep_status', 5, status='Final')
+    metrics.set_gauge('bs4_parser_mode_duration_seconds', 1.5, mode='pep')
+
+    path = tmp_path / 'parser.prom'
+    metrics.write_textfile(path)
+    got = path.read_text(encoding='utf-8')
+
+    assert '# TYPE bs4_parser_requests_total counter' in got
+    assert 'bs4_parser_requests_total 3\n' in got
+    assert 'bs4_parser_pep_status{status="Final"} 5\n' in got
+    assert 'bs4_parser_mode_duration_seconds{mode="pep"} 1.5\n' in got
+    assert 'bs4_parser_cache_hits_total' not in got
+    metrics.reset()
+
+
+def test_counters_roundtrip_skips_gauges():
+    metrics.reset()
+    metrics.inc('bs4_parser_requests_total', 2)
+    metrics.inc('bs4_parser_cache_hits_total', mode='pep')
+    metrics.set_gauge('bs4_parser_pep_status', 5, status='Final')
+    samples = metrics.counters()
+    metrics.reset()
+
+    metrics.add_counters(samples)
+    metrics.add_counters(samples)
+    assert metrics.get('bs4_parser_requests_total') == 4
+    assert metrics.get('bs4_parser_cache_hits_total', mode='pep') == 2
+    assert metrics.get('bs4_parser_pep_status', status='Final') == 0
+    metrics.reset()
@@ -90,3 +90,112 @@ def test_output_file():
     assert hasattr(outputs, 'file_output'), (
         'Напишите функцию `file_output` в модуле `output.py`'
     )
+
+
+def test_diff_results():
+    previous = [
+        ('Статус', 'Количество'),
+        ('Draft', '5'), ('Final', '10'), ('Deferred', '1'),
+    ]
+    current = [
+        ('Статус', 'Количество'),
+        ('Draft', 4), ('Final', 10), ('Accepted', 1),
+    ]
+    got = outputs.diff_results(previous, current)
+    assert got == [
+        ('Изменение', 'Статус', 'Количество'),
+        ('Изменено', 'Draft', '5 → 4'),
+        ('Добавлено', 'Accepted', '1'),
+        ('Удалено', 'Deferred', '1'),
+    ]
+
+
+def test_control_output_diff(monkeypatch, tmp_path, capsys, records):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    results_dir = Path(tmp_path) / 'results'
+    results_dir.mkdir()
+    previous = results_dir / 'pep_2000-01-01_00-00-00.csv'
+    previous.write_text(
+        'Статус,Количество\nActive,1\n', encoding='utf-8')
+
+    cli_arg = Namespace(mode='pep', output='file', diff=True)
+    outputs.control_output(records('pep'), cli_arg)
+    captured_out, _ = capsys.readouterr()
+
+    assert 'Изменено Active 1 → 36' in captured_out
+    assert len(list(results_dir.glob('pep_*.csv'))) == 2
+
+
+def test_control_output_incomplete_file(monkeypatch, tmp_path, records):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    outputs.control_output(
+        records('pep'), cli_args('pep', 'file'), incomplete=True)
+    output_files = list((Path(tmp_path) / 'results').glob('*.csv'))
+    assert output_files[0].stem.endswith('_incomplete')
+    assert outputs.load_previous_results('pep') == []
+
+
+def test_partial_run_file_name(monkeypatch, tmp_path, records):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    cli_arg = Namespace(mode='pep', output='file', pep_range=(600, 799),
+                        shard=(1, 2))
+    outputs.control_output(records('pep'), cli_arg)
+    output_files = list((Path(tmp_path) / 'results').glob('*.csv'))
+    assert output_files[0].name.startswith('pep-range-600-799-shard-1-of-2_')
+    assert outputs.load_previous_results('pep') == []
+
+
+def test_merged_ranges_file_name(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    merged = [('Статус', 'Количество (PEP 1-500 + PEP 501-900, шард 1/2)'),
+              ('Final', 3), ('Всего', 3)]
+    outputs.control_output(
+        merged, Namespace(mode='pep', output='file', merge=['a.csv']),
+        incomplete='Результат неполный: не хватает частей')
+    output_files = list((Path(tmp_path) / 'results').glob('*.csv'))
+    assert output_files[0].name.startswith(
+        'pep-range-1-500-range-501-900-shard-1-of-2_')
+    assert output_files[0].stem.endswith('_incomplete')
+    assert outputs.load_previous_results('pep') == []
+
+
+def test_control_output_keeps_mode_diff(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    changes = [
+        ('Изменение', 'Ссылка на PEP', 'Буква', 'Статус'),
+        ('Изменено', 'https://peps.python.org/pep-0008/', 'A',
+         'Draft → Accepted'),
+    ]
+    outputs.control_output(
+        changes, Namespace(mode='pep', output='file', diff=True))
+    output_files = list((Path(tmp_path) / 'results').glob('*.csv'))
+    assert [path.name[:9] for path in output_files] == ['pep-diff_']
+    assert output_files[0].read_text(encoding='utf-8').count('\n') == 2
+
+
+def test_matrix_file_name(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    matrix = [('Буква \\ Статус', 'Final'), ('F', 3)]
+    outputs.control_output(
+        matrix, Namespace(mode='pep', output='file', matrix=True))
+    output_files = list((Path(tmp_path) / 'results').glob('*.csv'))
+    assert output_files[0].name.startswith('pep-matrix_')
+    assert outputs.load_previous_results('pep') == []
+
+
+def test_incomplete_diff_does_not_report_removed(
+        monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    results_dir = Path(tmp_path) / 'results'
+    results_dir.mkdir()
+    (results_dir / 'whats-new_2000-01-01_00-00-00.csv').write_text(
+        'Ссылка,Заголовок,Редактор\nhttps://a,A,X\nhttps://b,B,Y\n',
+        encoding='utf-8')
+
+    current = [('Ссылка', 'Заголовок', 'Редактор'), ('https://a', 'A', 'Z')]
+    outputs.control_output(
+        current, Namespace(mode='whats-new', output=None, diff=True),
+        incomplete=True)
+    captured_out, _ = capsys.readouterr()
+    assert 'Изменено https://a A X → Z' in captured_out
+    assert 'Удалено' not in captured_out
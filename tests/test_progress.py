@@ -0,0 +1,26 @@
+import logging
+
+try:
+    from src import progress
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `progress.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `progress.py`'
+
+
+def test_make_progress_modes():
+    assert isinstance(progress.make_progress(10, 'pep', 'none'),
+                      progress.NullProgress)
+    assert isinstance(progress.make_progress(10, 'pep', 'log'),
+                      progress.LogProgress)
+
+
+def test_log_progress_is_throttled(caplog):
+    bar = progress.make_progress(1000, 'pep', 'log')
+    with caplog.at_level(logging.INFO):
+        for _ in range(1000):
+            bar.update()
+        bar.close()
+    assert bar.done == 1000
+    assert len(caplog.records) == 1
+    assert '1000 из 1000' in caplog.records[0].getMessage()
@@ -0,0 +1,42 @@
+import pytest
+try:
+    from src import records
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `records.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `records.py`'
+
+
+def test_record_behaves_like_row():
+    entry = records.VersionEntry(
+        'https://docs.python.org/3.12/', '3.12', 'stable')
+    assert entry == ('https://docs.python.org/3.12/', '3.12', 'stable')
+    assert list(entry) == ['https://docs.python.org/3.12/', '3.12', 'stable']
+    assert len(entry) == 3
+    assert entry[1] == '3.12'
+    assert not hasattr(entry, '__dict__')
+
+
+def test_crawl_error_is_formatted_lazily():
+    error = records.CrawlError(
+        'https://peps.python.org/pep-0008/', 'TAG_ERROR', 'Не найден тег dl')
+    assert error.details == 'Не найден тег dl'
+    assert str(error) == (
+        'Ошибка парсинга https://peps.python.org/pep-0008/: '
+        'Не найден тег dl'
+    )
+
+
+def test_record_rejects_wrong_number_of_values():
+    with pytest.raises(TypeError):
+        records.VersionEntry('https://docs.python.org/3.12/')
+    with pytest.raises(TypeError):
+        records.VersionEntry('link', '3.12', 'stable', 'extra')
+
+
+def test_crawl_error_does_not_keep_exception():
+    try:
+        raise ValueError('Не найден тег dl')
+    except ValueError as e:
+        error = records.CrawlError('https://peps.python.org/', 'TAG_ERROR', e)
+    assert error.details == 'Не найден тег dl'
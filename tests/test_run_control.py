@@ -0,0 +1,58 @@
+import pytest
+try:
+    from src import utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `utils.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `utils.py`'
+
+# Модуль, который на самом деле использует парсер: `src.run_control`
+# был бы отдельным объектом со своим состоянием.
+run_control = utils.run_control
+
+
+@pytest.fixture(autouse=True)
+def reset_run_control():
+    run_control.start()
+    yield
+    run_control.start()
+
+
+def test_run_without_deadline():
+    assert not run_control.should_stop()
+    assert run_control.request_timeout() == 30
+    run_control.stop()
+    assert run_control.should_stop()
+
+
+def test_deadline_limits_request_timeout():
+    run_control.start(5)
+    assert 0 < run_control.request_timeout() <= 5
+    run_control.start(-1)
+    assert run_control.should_stop()
+    assert run_control.request_timeout() < 0
+    run_control.mark_incomplete()
+    assert run_control.is_incomplete()
+    run_control.mark_incomplete('Не хватает шардов')
+    assert run_control.incomplete_reason() == (
+        run_control.PEP_LOGGING['INCOMPLETE_RESULTS'])
+    run_control.start()
+    assert not run_control.is_incomplete()
+    assert run_control.incomplete_reason() is None
+
+
+def test_expired_deadline_blocks_requests():
+    run_control.start(-1)
+    with pytest.raises(utils.Timeout):
+        utils.get_response(None, 'https://peps.python.org/')
+
+
+def test_only_repeated_signal_interrupts(monkeypatch):
+    import signal
+
+    monkeypatch.setattr(run_control.logging, 'warning', lambda message: None)
+    run_control._handle_signal(signal.SIGINT, None)
+    run_control._handle_signal(signal.SIGTERM, None)
+    assert run_control.should_stop()
+    with pytest.raises(KeyboardInterrupt):
+        run_control._handle_signal(signal.SIGTERM, None)
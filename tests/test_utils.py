@@ -54,3 +54,103 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+def test_get_soup_memoized():
+    utils.clear_soup_cache()
+    url = MAIN_DOC_URL + 'memoized_page/'
+    with requests_mock.Mocker() as mock:
+        mock.get(url, text='<h1>Memo</h1>', status_code=200)
+        session = requests.Session()
+        first = utils.get_soup(session, url)
+        second = utils.get_soup(session, url)
+        assert first is second
+        assert mock.call_count == 1
+    assert utils.soup_cache_stats == {'hits': 1, 'misses': 1}
+
+
+def test_get_soup_single_flight():
+    from concurrent.futures import ThreadPoolExecutor
+
+    utils.clear_soup_cache()
+    url = MAIN_DOC_URL + 'coalesced_page/'
+    with requests_mock.Mocker() as mock:
+        mock.get(url, text='<h1>Once</h1>', status_code=200)
+        session = requests.Session()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            soups = list(executor.map(
+                lambda _: utils.get_soup(session, url), range(8)))
+        assert mock.call_count == 1
+    assert all(soup is soups[0] for soup in soups)
+
+
+def test_get_extracted_skips_parsing_unchanged_page(tmp_path):
+    from src import content_store
+
+    store = content_store.ContentStore(
+        tmp_path / 'store.sqlite3', {'title': 1}, max_entries=10)
+    url = MAIN_DOC_URL + 'extracted_page/'
+    calls = []
+
+    def extract(soup):
+        calls.append(soup)
+        return soup.find('h1').text
+
+    with requests_mock.Mocker() as mock:
+        mock.get(url, text='<h1>Stored</h1>', status_code=200)
+        session = requests.Session()
+        utils.clear_soup_cache()
+        first = utils.get_extracted(session, url, 'title', extract, store)
+        utils.clear_soup_cache()
+        second = utils.get_extracted(session, url, 'title', extract, store)
+        assert mock.call_count == 2
+    assert first == second == 'Stored'
+    assert len(calls) == 1
+    store.close()
+
+
+def test_get_extracted_single_flight(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from src import content_store
+
+    utils.clear_soup_cache()
+    store = content_store.ContentStore(
+        tmp_path / 'store.sqlite3', {'title': 1}, max_entries=10)
+    url = MAIN_DOC_URL + 'extracted_once/'
+    with requests_mock.Mocker() as mock:
+        mock.get(url, text='<h1>Once</h1>', status_code=200)
+        session = requests.Session()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            titles = list(executor.map(
+                lambda _: utils.get_extracted(
+                    session, url, 'title',
+                    lambda soup: soup.find('h1').text, store),
+                range(8)))
+        assert mock.call_count == 1
+    assert titles == ['Once'] * 8
+    assert utils.soup_cache_stats == {'hits': 7, 'misses': 1}
+    store.close()
+
+
+@pytest.mark.parametrize('headers, body', [
+    ({'Content-Type': 'text/html; charset=windows-1251'},
+     '<h1>Привет</h1>'.encode('cp1251')),
+    ({'Content-Type': 'text/html'},
+     '<meta charset="windows-1251"><h1>Привет</h1>'.encode('cp1251')),
+    ({'Content-Type': 'text/html'}, '<h1>Привет</h1>'.encode('utf-8')),
+])
+def test_get_soup_uses_declared_encoding(headers, body):
+    utils.clear_soup_cache()
+    url = MAIN_DOC_URL + 'encoded_page/'
+    with requests_mock.Mocker() as mock:
+        mock.get(url, content=body, headers=headers)
+        soup = utils.get_soup(requests.Session(), url)
+    assert soup.find('h1').text == 'Привет'
+
+
+def test_parse_error_is_counted():
+    utils.metrics.reset()
+    error = utils.parse_error('Не найден статус')
+    assert isinstance(error, utils.ParserFindTagException)
+    assert utils.metrics.get('bs4_parser_parse_errors_total') == 1
+    utils.metrics.reset()
@@ -0,0 +1,67 @@
+try:
+    from src import work_queue
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `work_queue.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `work_queue.py`'
+
+
+def test_work_queue_roundtrip(tmp_path):
+    queue = work_queue.SqliteWorkQueue(tmp_path / 'queue.sqlite3')
+    queue.put_many([('F', 'https://peps.python.org/pep-0001/'),
+                    ('A', 'https://peps.python.org/pep-0002/')])
+    assert queue.unfinished_count() == 2
+
+    first = queue.claim('worker-1')
+    second = queue.claim('worker-2')
+    assert first[0] != second[0]
+    assert queue.claim('worker-3') is None
+
+    queue.complete(first[0], 'Final')
+    queue.complete(second[0], None, 'Ошибка загрузки')
+    assert queue.unfinished_count() == 0
+    assert queue.results() == [
+        ('F', 'https://peps.python.org/pep-0001/', 'Final', None),
+        ('A', 'https://peps.python.org/pep-0002/', None, 'Ошибка загрузки'),
+    ]
+    queue.close()
+
+
+def test_work_queue_requeue_stale(tmp_path):
+    queue = work_queue.SqliteWorkQueue(tmp_path / 'queue.sqlite3')
+    queue.put_many([('F', 'https://peps.python.org/pep-0001/')])
+    task = queue.claim('lost-worker')
+    queue.requeue_stale(timeout=-1)
+    assert queue.claim('worker-1') == task
+    queue.close()
+
+
+def test_work_queue_state(tmp_path):
+    queue = work_queue.SqliteWorkQueue(tmp_path / 'queue.sqlite3')
+    assert queue.state() is None
+    queue.reset()
+    assert queue.state() == work_queue.QUEUE_OPEN
+    queue.finish()
+    assert queue.state() == work_queue.QUEUE_CLOSED
+    queue.close()
+
+
+def test_work_queue_release_dead_worker(tmp_path):
+    queue = work_queue.SqliteWorkQueue(tmp_path / 'queue.sqlite3')
+    queue.put_many([('F', 'https://peps.python.org/pep-0001/'),
+                    ('A', 'https://peps.python.org/pep-0002/')])
+    first = queue.claim('dead-worker')
+    queue.release('dead-worker', 'упал', max_attempts=2)
+    assert queue.claim('worker-1') == first
+    queue.release('worker-1', 'упал', max_attempts=2)
+    assert queue.unfinished_count() == 1
+    assert queue.results()[0][3] == 'упал'
+    queue.close()
+
+
+def test_work_queue_collects_worker_metrics(tmp_path):
+    queue = work_queue.SqliteWorkQueue(tmp_path / 'queue.sqlite3')
+    queue.add_metrics([('bs4_parser_requests_total', {}, 3)])
+    queue.add_metrics([('bs4_parser_requests_total', {}, 4)])
+    assert queue.metrics() == [('bs4_parser_requests_total', {}, 7)]
+    queue.close()